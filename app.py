@@ -6,31 +6,56 @@ Minimal entry point that imports backend and UI, then launches the app.
 Includes Windows-specific fix for frameless window maximization.
 """
 
-import webview
+import os
 import ctypes
-from ctypes import windll
+import webview
 from backend import API
 from ui import HTML
 
+# Windows Style Constants
+GWL_STYLE = -16
+WS_THICKFRAME = 0x00040000
+WS_CAPTION = 0x00C00000
+SWP_REFRESH_FRAME = 0x0237
+
+# ============================================================================
+# USER32 BINDINGS
+# ============================================================================
+
+_GetWindowLongPtr = _SetWindowLongPtr = _SetWindowPos = None
+
+if os.name == 'nt':
+    from ctypes import wintypes
+
+    _user32 = ctypes.windll.user32
+    # 32-bit user32 only exports the non-Ptr names
+    _GetWindowLongPtr = getattr(_user32, 'GetWindowLongPtrW', _user32.GetWindowLongW)
+    _GetWindowLongPtr.argtypes = [wintypes.HWND, ctypes.c_int]
+    _GetWindowLongPtr.restype = ctypes.c_ssize_t
+
+    _SetWindowLongPtr = getattr(_user32, 'SetWindowLongPtrW', _user32.SetWindowLongW)
+    _SetWindowLongPtr.argtypes = [wintypes.HWND, ctypes.c_int, ctypes.c_ssize_t]
+    _SetWindowLongPtr.restype = ctypes.c_ssize_t
+
+    _SetWindowPos = _user32.SetWindowPos
+    _SetWindowPos.argtypes = [wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int,
+                              ctypes.c_int, ctypes.c_int, wintypes.UINT]
+    _SetWindowPos.restype = wintypes.BOOL
+
+
 def fix_window_behavior(window):
+    if _SetWindowPos is None:
+        return
     try:
-        import ctypes
-        from ctypes import windll
-        
         # FIX: Convert .NET Handle to Python Integer
         hwnd = window.native.Handle.ToInt64()
         
-        # Windows Style Constants
-        GWL_STYLE = -16
-        WS_THICKFRAME = 0x00040000 
-        WS_CAPTION = 0x00C00000
-        
-        current_style = windll.user32.GetWindowLongW(hwnd, GWL_STYLE)
+        current_style = _GetWindowLongPtr(hwnd, GWL_STYLE)
         new_style = (current_style | WS_THICKFRAME) & ~WS_CAPTION
-        windll.user32.SetWindowLongW(hwnd, GWL_STYLE, new_style)
+        _SetWindowLongPtr(hwnd, GWL_STYLE, new_style)
         
         # Force Redraw
-        windll.user32.SetWindowPos(hwnd, 0, 0, 0, 0, 0, 0x0237)
+        _SetWindowPos(hwnd, None, 0, 0, 0, 0, SWP_REFRESH_FRAME)
         print("Window style patched successfully.")
     except Exception as e:
         print(f"Window patch failed: {e}")
@@ -44,8 +69,9 @@ def main():
     print("   Document Analysis · Export")
     print("=" * 50 + "\n")
     
-    # Create API instance
+    # Create API instance and start loading models while the window is being built
     api = API()
+    api.start_initialization()
     
     # Create window
     window = webview.create_window(
@@ -15,6 +15,8 @@ import json
 import pickle
 import re
 import os
+import socket
+import shutil
 import subprocess
 import time
 import uuid
@@ -23,30 +25,116 @@ import logging
 import atexit
 import base64
 import threading
+import queue
+import functools
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from io import BytesIO
 import numpy as np
 
-warnings.filterwarnings('ignore', category=DeprecationWarning)
-logging.getLogger('pywebview').setLevel(logging.ERROR)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+_LOGGING_CONFIGURED = False
+
+def _configure_warnings_and_logging():
+    global _LOGGING_CONFIGURED
+    if _LOGGING_CONFIGURED:
+        return
+    warnings.filterwarnings('ignore', category=DeprecationWarning)
+    os.environ.setdefault('HF_HUB_DISABLE_TELEMETRY', '1')
+    logging.getLogger('pywebview').setLevel(logging.ERROR)
+    _LOGGING_CONFIGURED = True
+
+_configure_warnings_and_logging()
 
 # ==============================================================================
 # CONFIGURATION
 # ==============================================================================
 
 CHROMA_PATH = "./chroma_db_v2"
+ANSWER_CACHE_PATH = "./answer_cache"
 BM25_PATH = "./bm25_index.pkl"
+BM25_CACHE_PATH = "./bm25_csc"
 DOCS_PATH = "./documents.json"
 CHAT_HISTORY_PATH = "./chat_history"
+# Versioned: caches written before adapters were filtered to present ones may hold a stale 'dgpu'
+GPU_CACHE_PATH = "./.gpu_type_v2"
+GPU_CACHE_MAX_AGE = 30 * 24 * 3600
 EMBEDDING_MODEL = 'intfloat/multilingual-e5-base'
+EMBEDDING_INT8_PATH = "./embedder_int8"
+EMBEDDING_INT8_FILE = 'onnx/model_qint8_avx2.onnx'
+EMBEDDING_INT8_MIN_COSINE = 0.99
+# Document chunks per forward pass: bigger batches keep a GPU busy, CPU gains little past 32
+EMBED_BATCH_SIZE_GPU = 128
+EMBED_BATCH_SIZE_CPU = 32
 MAX_DOCUMENT_PAGES = 50
 LLM_MODEL = 'aya:8b'
+OLLAMA_ADDR = ('127.0.0.1', 11434)
+OLLAMA_HOST = 'http://%s:%d' % OLLAMA_ADDR
+OLLAMA_KEEP_ALIVE = '30m'
 OLLAMA_DOWNLOAD_URL = 'https://ollama.com/download'
+SEMANTIC_CACHE_SIZE = 512
+QUERY_EMBEDDING_CACHE_SIZE = 512
+CHUNK_EMBEDDING_CACHE_SIZE = 2048
+SEMANTIC_CACHE_THRESHOLD = 0.97
+ANSWER_CACHE_THRESHOLD = 0.999
+# Chroma's cosine distance is 1 - similarity, so the persistent cache uses the same bar as the in-memory one
+ANSWER_CACHE_DISTANCE = 1 - ANSWER_CACHE_THRESHOLD
+ANSWER_CACHE_MAX_ENTRIES = 2000
+# The answer cache is small and a missed hit costs a full LLM call, so recall beats build speed
+# (chromadb 0.5 defaults search_ef to 10; later releases use 100)
+ANSWER_CACHE_HNSW = {"hnsw:space": "cosine", "hnsw:M": 32, "hnsw:construction_ef": 200, "hnsw:search_ef": 100}
+MATRIX_SEARCH_MAX = 50000
+CHROMA_PAGE_SIZE = 1000
+# Partitions below this many rows are scored exactly; bigger ones are shortlisted by Hamming distance first
+BINARY_SEARCH_MIN_ROWS = 4096
+BINARY_SHORTLIST_FACTOR = 32
+PROMPT_FRAGMENT_CACHE_SIZE = 4096
+PROMPT_CONTEXT_CACHE_SIZE = 8
+PROMPT_CHUNK_MAX_CHARS = 2400
+LLM_NUM_CTX = 4096
+SOURCE_LABEL_MAX = 35
+# Exported reports are written through a 1 MiB buffer whatever the platform default
+EXPORT_WRITE_BUFFER = 1 << 20
+# Small-int codes for the per-document filter arrays
+REGULATOR_CODES = {'SAMA': 0, 'CMA': 1}
+LANGUAGE_CODES = {'en': 0, 'ar': 1}
 
 Path(CHAT_HISTORY_PATH).mkdir(exist_ok=True)
 OLLAMA_PROCESS = None
 
+# ==============================================================================
+# JSON HELPERS
+# ==============================================================================
+
+def json_dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False)
+
+def json_dumpb(obj):
+    """UTF-8 bytes for files opened in binary mode; skips the str round trip orjson would otherwise need."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def json_loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 # ==============================================================================
 # PROGRESS TRACKING
 # ==============================================================================
@@ -63,40 +151,38 @@ class ProgressTracker:
         ('ready', 'Ready!', 100),
     ]
     
+    STAGE_INFO = {sid: (text, progress) for sid, text, progress in STAGES}
+
     def __init__(self):
+        # (stage, stage_text, progress, error, details); replaced as a whole so readers need no lock
+        self._state = ('starting', 'Initializing...', 0, None, None)
         self._lock = threading.Lock()
-        self._stage = 'starting'
-        self._stage_text = 'Initializing...'
-        self._progress = 0
-        self._error = None
-        self._details = None
         self.last_brief = None
     
     def set_stage(self, stage_id, details=None):
+        info = self.STAGE_INFO.get(stage_id)
+        if info is None:
+            return
+        text, progress = info
         with self._lock:
-            for sid, text, progress in self.STAGES:
-                if sid == stage_id:
-                    self._stage = sid
-                    self._stage_text = text
-                    self._progress = progress
-                    self._details = details
-                    print(f"  [{progress:3d}%] {text}" + (f" ({details})" if details else ""))
-                    break
+            self._state = (stage_id, text, progress, self._state[3], details)
+        print(f"  [{progress:3d}%] {text}" + (f" ({details})" if details else ""))
     
     def set_error(self, error_msg):
         with self._lock:
-            self._error = error_msg
-            print(f"  [ERROR] {error_msg}")
+            stage, text, progress, _, details = self._state
+            self._state = (stage, text, progress, error_msg, details)
+        print(f"  [ERROR] {error_msg}")
     
     def get_status(self):
-        with self._lock:
-            return {
-                'stage': self._stage,
-                'stage_text': self._stage_text,
-                'progress': self._progress,
-                'error': self._error,
-                'details': self._details
-            }
+        stage, text, progress, error, details = self._state
+        return {
+            'stage': stage,
+            'stage_text': text,
+            'progress': progress,
+            'error': error,
+            'details': details
+        }
 
 progress_tracker = ProgressTracker()
 
@@ -104,24 +190,121 @@ progress_tracker = ProgressTracker()
 # GPU DETECTION
 # ==============================================================================
 
+def _read_gpu_cache():
+    try:
+        cache = Path(GPU_CACHE_PATH)
+        if time.time() - cache.stat().st_mtime < GPU_CACHE_MAX_AGE:
+            gpu_type = cache.read_text(encoding='utf-8').strip()
+            if gpu_type in ('igpu', 'dgpu'):
+                return gpu_type
+    except OSError:
+        pass
+    return None
+
+def _write_gpu_cache(gpu_type):
+    try:
+        tmp = f"{GPU_CACHE_PATH}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(gpu_type)
+        os.replace(tmp, GPU_CACHE_PATH)
+    except OSError:
+        pass
+
+DISPLAY_CLASS_GUID = "{4d36e968-e325-11ce-bfc1-08002be10318}"
+DISPLAY_CLASS_KEY = "SYSTEM\\CurrentControlSet\\Control\\Class\\" + DISPLAY_CLASS_GUID
+DEVICE_ENUM_KEY = "SYSTEM\\CurrentControlSet\\Enum\\"
+CM_GETIDLIST_FILTER_PRESENT = 0x100
+CM_GETIDLIST_FILTER_CLASS = 0x200
+GPU_VENDOR_NAMES = {'ven_10de': 'nvidia', 'ven_8086': 'intel', 'ven_1002': 'amd'}
+
+def _present_display_drivers():
+    """Class subkey names ('0000', ...) of the display adapters present right now, via the Configuration Manager."""
+    import ctypes
+    import winreg
+    from ctypes import wintypes
+    cfgmgr = ctypes.WinDLL('cfgmgr32')
+    cfgmgr.CM_Get_Device_ID_List_SizeW.argtypes = [ctypes.POINTER(wintypes.ULONG), wintypes.LPCWSTR, wintypes.ULONG]
+    cfgmgr.CM_Get_Device_ID_ListW.argtypes = [wintypes.LPCWSTR, wintypes.LPWSTR, wintypes.ULONG, wintypes.ULONG]
+    flags = CM_GETIDLIST_FILTER_CLASS | CM_GETIDLIST_FILTER_PRESENT
+    size = wintypes.ULONG()
+    if cfgmgr.CM_Get_Device_ID_List_SizeW(ctypes.byref(size), DISPLAY_CLASS_GUID, flags) != 0:
+        raise OSError("CM_Get_Device_ID_List_Size failed")
+    buffer = ctypes.create_unicode_buffer(size.value)
+    if cfgmgr.CM_Get_Device_ID_ListW(DISPLAY_CLASS_GUID, buffer, size.value, flags) != 0:
+        raise OSError("CM_Get_Device_ID_List failed")
+    drivers = set()
+    # Double-NUL-terminated list of device instance IDs; each one's Driver value is "<class guid>\\<subkey>"
+    for instance_id in filter(None, buffer[:size.value].split('\0')):
+        try:
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, DEVICE_ENUM_KEY + instance_id) as dev_key:
+                drivers.add(winreg.QueryValueEx(dev_key, 'Driver')[0].rsplit('\\', 1)[-1])
+        except OSError:
+            # Present but without a driver bound (no class subkey to describe it)
+            continue
+    return drivers
+
+def _registry_adapter_names():
+    """Descriptions of present display adapters from the display class key (no process spawn)."""
+    import winreg
+    # The class key keeps entries for removed cards, eGPUs and old driver installs; only present ones count
+    present = _present_display_drivers()
+    names = []
+    with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, DISPLAY_CLASS_KEY) as cls_key:
+        index = 0
+        while True:
+            try:
+                sub = winreg.EnumKey(cls_key, index)
+            except OSError:
+                break
+            index += 1
+            if sub not in present:
+                continue
+            try:
+                with winreg.OpenKey(cls_key, sub) as dev_key:
+                    desc = winreg.QueryValueEx(dev_key, 'DriverDesc')[0]
+                    try:
+                        device_id = winreg.QueryValueEx(dev_key, 'MatchingDeviceId')[0].lower()
+                    except OSError:
+                        device_id = ''
+            except OSError:
+                continue
+            vendor = next((v for k, v in GPU_VENDOR_NAMES.items() if k in device_id), '')
+            names.append(f"{vendor} {desc}".strip())
+    return names
+
+IGPU_RE = re.compile(r'intel|amd radeon graphics|vega|radeon\(tm\) graphics', re.IGNORECASE)
+DGPU_RE = re.compile(r'nvidia|rtx|gtx|geforce|radeon rx|radeon pro', re.IGNORECASE)
+
+def _wmic_adapter_names():
+    output = subprocess.check_output(
+        ["wmic", "path", "win32_VideoController", "get", "name"],
+        creationflags=subprocess.CREATE_NO_WINDOW
+    )
+    # Only ASCII markers are matched; NULs are dropped in case wmic emits UTF-16
+    return output.replace(b'\x00', b'').decode('latin-1', 'ignore').splitlines()[1:]
+
+@functools.lru_cache(maxsize=1)
 def detect_gpu_type():
+    """Detect the GPU once per process; the result is persisted so later boots skip the probe."""
     if os.name != 'nt':
         return 'unknown'
+    cached = _read_gpu_cache()
+    if cached:
+        return cached
     try:
-        output = subprocess.check_output(
-            ["wmic", "path", "win32_VideoController", "get", "name"],
-            universal_newlines=True,
-            creationflags=subprocess.CREATE_NO_WINDOW
-        ).lower()
-        igpu_markers = ['intel', 'amd radeon graphics', 'vega', 'radeon(tm) graphics']
-        dgpu_markers = ['nvidia', 'rtx', 'gtx', 'geforce', 'radeon rx', 'radeon pro']
-        has_igpu = any(m in output for m in igpu_markers)
-        has_dgpu = any(m in output for m in dgpu_markers)
-        if has_dgpu:
-            return 'dgpu'
-        elif has_igpu:
-            return 'igpu'
-        return 'unknown'
+        try:
+            names = _registry_adapter_names()
+        except OSError:
+            names = []
+        if not names:
+            names = _wmic_adapter_names()
+        output = "\n".join(names)
+        has_igpu = IGPU_RE.search(output) is not None
+        has_dgpu = DGPU_RE.search(output) is not None
+        gpu_type = 'dgpu' if has_dgpu else 'igpu' if has_igpu else 'unknown'
+        if gpu_type != 'unknown':
+            _write_gpu_cache(gpu_type)
+        return gpu_type
     except Exception as e:
         print(f"    GPU detection failed: {e}")
         return 'unknown'
@@ -146,7 +329,8 @@ def configure_gpu_environment():
 # OLLAMA MANAGEMENT
 # ==============================================================================
 
-def check_ollama_installed():
+@functools.lru_cache(maxsize=1)
+def _find_ollama():
     if os.name == 'nt':
         ollama_paths = [
             os.path.expandvars(r'%LOCALAPPDATA%\Programs\Ollama\ollama.exe'),
@@ -155,22 +339,25 @@ def check_ollama_installed():
         ]
         for path in ollama_paths:
             if os.path.exists(path):
-                return True, path
-        try:
-            result = subprocess.run(['where', 'ollama'], capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            if result.returncode == 0:
-                return True, 'ollama'
-        except:
-            pass
-        return False, None
-    else:
-        try:
-            result = subprocess.run(['which', 'ollama'], capture_output=True)
-            if result.returncode == 0:
-                return True, result.stdout.decode().strip()
-        except:
-            pass
+                return path
+    # PATH lookup in-process instead of spawning where/which
+    return shutil.which('ollama')
+
+def check_ollama_installed():
+    # Only a successful lookup is cached, so installing Ollama while the app is open is still noticed
+    path = _find_ollama()
+    if path is None:
+        _find_ollama.cache_clear()
         return False, None
+    return True, path
+
+def _ollama_port_open(timeout=0.05):
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            return sock.connect_ex(OLLAMA_ADDR) == 0
+    except OSError:
+        return False
 
 def start_ollama():
     global OLLAMA_PROCESS
@@ -179,9 +366,15 @@ def start_ollama():
         return False, 'not_installed'
     
     if os.name == 'nt':
+        # Always kill the tray app too: it may not have bound the port yet, and
+        # its own server would race ours without our iGPU environment.
         for proc_name in ['ollama app.exe', 'Ollama.exe', 'ollama.exe']:
             subprocess.run(['taskkill', '/F', '/IM', proc_name], capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
-        time.sleep(2)
+        # Wait only as long as the old server takes to release the port
+        for _ in range(100):
+            if not _ollama_port_open():
+                break
+            time.sleep(0.02)
     
     try:
         if os.name == 'nt':
@@ -198,17 +391,14 @@ def start_ollama():
             OLLAMA_PROCESS = subprocess.Popen(['ollama', 'serve'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=os.environ)
         
         atexit.register(stop_ollama)
-        import socket
-        for i in range(30):
-            time.sleep(1)
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                result = sock.connect_ex(('127.0.0.1', 11434))
-                sock.close()
-                if result == 0:
-                    return True, 'started'
-            except:
-                pass
+        # Back off from 20 ms to 500 ms so a fast start is noticed almost immediately
+        delay = 0.02
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if _ollama_port_open():
+                return True, 'started'
+            time.sleep(delay)
+            delay = min(delay * 1.5, 0.5)
         return False, 'timeout'
     except Exception as e:
         return False, str(e)
@@ -245,6 +435,73 @@ def pull_model_with_progress(model_name, progress_callback=None):
     except Exception as e:
         return False, str(e)
 
+# ==============================================================================
+# EMBEDDING MODEL
+# ==============================================================================
+
+# Bilingual spot check for the quantized export; every pair must stay above EMBEDDING_INT8_MIN_COSINE
+INT8_CHECK_TEXTS = [
+    "query: What are the licensing fees for finance companies?",
+    "query: ما هي متطلبات رأس المال لإصدار الصكوك؟",
+    "passage: The issuer shall disclose all material information in the prospectus.",
+    "passage: يجب على شركة التمويل الحصول على ترخيص من البنك المركزي قبل مزاولة النشاط.",
+]
+
+def _hub_embedder(**kwargs):
+    """EMBEDDING_MODEL from the local Hugging Face cache; the hub is only contacted when files are missing."""
+    from sentence_transformers import SentenceTransformer
+    try:
+        return SentenceTransformer(EMBEDDING_MODEL, local_files_only=True, **kwargs)
+    except Exception:
+        return SentenceTransformer(EMBEDDING_MODEL, **kwargs)
+
+def _load_int8_embedder():
+    """Dynamic-INT8 ONNX copy of the embedder, exported and checked against fp32 on first run; None if rejected."""
+    from sentence_transformers import SentenceTransformer
+    int8_dir = Path(EMBEDDING_INT8_PATH)
+    if (int8_dir / 'REJECTED').exists():
+        return None
+    if (int8_dir / EMBEDDING_INT8_FILE).exists():
+        return SentenceTransformer(str(int8_dir), backend='onnx', model_kwargs={'file_name': EMBEDDING_INT8_FILE})
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+    reference = _hub_embedder(backend='onnx')
+    reference.save(str(int8_dir))
+    export_dynamic_quantized_onnx_model(reference, 'avx2', str(int8_dir))
+    model = SentenceTransformer(str(int8_dir), backend='onnx', model_kwargs={'file_name': EMBEDDING_INT8_FILE})
+    expected = reference.encode(INT8_CHECK_TEXTS, normalize_embeddings=True)
+    actual = model.encode(INT8_CHECK_TEXTS, normalize_embeddings=True)
+    worst = float((expected * actual).sum(axis=1).min())
+    if worst < EMBEDDING_INT8_MIN_COSINE:
+        # Remembered so the export isn't retried on every start
+        (int8_dir / 'REJECTED').write_text(f'min cosine {worst:.4f}\n')
+        print(f"    ⚠ INT8 embedder rejected (min cosine {worst:.4f})")
+        return None
+    return model
+
+def load_embedder():
+    """fp16 on CUDA, INT8 then fp32 ONNX Runtime on CPU, plain fp32 torch if none is available."""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            print("    ✓ Embedder: CUDA fp16")
+            return _hub_embedder(device='cuda', model_kwargs={'torch_dtype': torch.float16})
+    except Exception as e:
+        print(f"    ⚠ CUDA embedder unavailable: {e}")
+    try:
+        model = _load_int8_embedder()
+        if model is not None:
+            print("    ✓ Embedder: ONNX Runtime INT8")
+            return model
+    except Exception as e:
+        print(f"    ⚠ INT8 embedder unavailable: {e}")
+    try:
+        model = _hub_embedder(backend='onnx')
+        print("    ✓ Embedder: ONNX Runtime")
+        return model
+    except Exception as e:
+        print(f"    ⚠ ONNX embedder unavailable ({e}), using default backend")
+    return _hub_embedder()
+
 # ==============================================================================
 # OPTIONAL IMPORTS
 # ==============================================================================
@@ -280,6 +537,54 @@ class ChatHistory:
         self.history_path = Path(CHAT_HISTORY_PATH)
         self.current_chat_id = None
         self.current_messages = []
+        self._preview = 'New Chat'
+        # (docs, regulator) behind the latest answer in this chat; follow-up questions reuse it
+        self.last_retrieval = None
+        # Saves run on one background thread; snapshots queued before it wakes collapse into one write
+        self._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chat-save')
+        self._save_lock = threading.Lock()
+        self._pending_saves = {}
+        self._flush_queued = False
+        self._save_future = None
+        self._recent_cache = (None, None)
+        self._migrate_legacy_chats()
+
+    # Each chat is an append-only <id>.jsonl message log plus a small <id>.meta.json
+    # (id, created, updated, preview, message_count) that the history list reads.
+    def _log_path(self, chat_id):
+        return self.history_path / f"{chat_id}.jsonl"
+
+    def _meta_path(self, chat_id):
+        return self.history_path / f"{chat_id}.meta.json"
+
+    def _migrate_legacy_chats(self):
+        """Convert chats saved as a single <id>.json document (done once per file)."""
+        for filepath in self.history_path.glob('*.json'):
+            if filepath.name.endswith('.meta.json'):
+                continue
+            try:
+                with open(filepath, 'rb') as f:
+                    data = json_loads(f.read())
+                messages = data.get('messages', [])
+                chat_id = data['id']
+                with open(self._log_path(chat_id), 'wb') as f:
+                    f.writelines(json_dumpb(msg) + b'\n' for msg in messages)
+                meta = {'id': chat_id, 'created': data.get('created', ''), 'updated': data.get('updated', ''),
+                        'preview': data.get('preview', 'Chat'), 'message_count': len(messages)}
+                self._write_meta(self._meta_path(chat_id), meta)
+                filepath.unlink()
+            except Exception as e:
+                print(f"    ⚠ Could not migrate chat {filepath.name}: {e}")
+
+    @staticmethod
+    def _write_meta(filepath, meta):
+        # Written beside the target and swapped in, so a crash never leaves a truncated sidecar
+        tmp_path = filepath.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(json_dumpb(meta))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
     
     def get_messages(self):
         return self.current_messages
@@ -287,6 +592,9 @@ class ChatHistory:
     def new_chat(self):
         self.current_chat_id = str(uuid.uuid4())[:8]
         self.current_messages = []
+        self._preview = 'New Chat'
+        self.last_retrieval = None
+        self._recent_cache = (None, None)
         return self.current_chat_id
     
     def add_message(self, role, content, sources=None, regulator=None):
@@ -296,62 +604,125 @@ class ChatHistory:
         if regulator:
             msg['regulator'] = regulator
         self.current_messages.append(msg)
-        self._save_current()
+        if role == 'user' and self._preview == 'New Chat':
+            self._preview = self._make_preview(content)
+        self._save_current(msg)
     
-    def _save_current(self):
+    def _save_current(self, msg):
         if not self.current_chat_id:
             return
-        filepath = self.history_path / f"{self.current_chat_id}.json"
-        chat_data = {
+        meta = {
             'id': self.current_chat_id,
-            'created': self.current_messages[0]['timestamp'] if self.current_messages else datetime.now().isoformat(),
+            'created': self.current_messages[0]['timestamp'],
             'updated': datetime.now().isoformat(),
-            'messages': self.current_messages,
-            'preview': self._get_preview()
+            'preview': self._get_preview(),
+            'message_count': len(self.current_messages)
         }
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(chat_data, f, ensure_ascii=False, indent=2)
+        with self._save_lock:
+            pending = self._pending_saves.setdefault(self.current_chat_id, {'lines': []})
+            pending['lines'].append(json_dumpb(msg) + b'\n')
+            pending['meta'] = meta
+            self._recent_cache = (None, None)
+            if not self._flush_queued:
+                self._flush_queued = True
+                self._save_future = self._save_executor.submit(self._flush_saves)
+
+    def _flush_saves(self):
+        while True:
+            with self._save_lock:
+                pending, self._pending_saves = self._pending_saves, {}
+                if not pending:
+                    self._flush_queued = False
+                    return
+            for chat_id, save in pending.items():
+                try:
+                    with open(self._log_path(chat_id), 'ab') as f:
+                        f.writelines(save['lines'])
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._write_meta(self._meta_path(chat_id), save['meta'])
+                except Exception as e:
+                    print(f"    ⚠ Chat save failed: {e}")
+
+    def wait_for_saves(self):
+        """Block until queued saves are on disk."""
+        future = self._save_future
+        if future is not None:
+            future.result()
     
+    @staticmethod
+    def _make_preview(text):
+        return text[:50] + '...' if len(text) > 50 else text
+
     def _get_preview(self):
-        for msg in self.current_messages:
-            if msg['role'] == 'user':
-                text = msg['content']
-                return text[:50] + '...' if len(text) > 50 else text
-        return 'New Chat'
+        # Set from the first user message in add_message / load_chat
+        return self._preview
     
     def get_recent_chats(self, limit=20):
+        self.wait_for_saves()
+        # Sidecar writes replace files, which bumps the directory mtime
+        key = (self.history_path.stat().st_mtime_ns, limit)
+        if self._recent_cache[0] == key:
+            return self._recent_cache[1]
         chats = []
-        for filepath in sorted(self.history_path.glob('*.json'), key=lambda x: x.stat().st_mtime, reverse=True):
+        for filepath in sorted(self.history_path.glob('*.meta.json'), key=lambda x: x.stat().st_mtime, reverse=True):
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    chats.append({'id': data['id'], 'preview': data.get('preview', 'Chat'), 'updated': data.get('updated', ''), 'message_count': len(data.get('messages', []))})
+                with open(filepath, 'rb') as f:
+                    data = json_loads(f.read())
+                    chats.append({'id': data['id'], 'preview': data.get('preview', 'Chat'), 'updated': data.get('updated', ''), 'message_count': data.get('message_count', 0)})
             except:
                 pass
             if len(chats) >= limit:
                 break
+        self._recent_cache = (key, chats)
         return chats
     
     def load_chat(self, chat_id):
-        filepath = self.history_path / f"{chat_id}.json"
+        self.wait_for_saves()
+        filepath = self._log_path(chat_id)
         if filepath.exists():
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.current_chat_id = chat_id
-                self.current_messages = data.get('messages', [])
-                return self.current_messages
+            messages = []
+            damaged = False
+            with open(filepath, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        messages.append(json_loads(line))
+                    except ValueError:
+                        # A line cut short by a crash mid-append
+                        damaged = True
+            if damaged:
+                # Rewrite once so later appends do not land on the partial line
+                print(f"    ⚠ Repairing chat log {filepath.name}")
+                tmp_path = filepath.with_suffix('.tmp')
+                with open(tmp_path, 'wb') as f:
+                    f.writelines(json_dumpb(msg) + b'\n' for msg in messages)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, filepath)
+            self.current_messages = messages
+            self.current_chat_id = chat_id
+            self.last_retrieval = None
+            first_user = next((m['content'] for m in self.current_messages if m['role'] == 'user'), None)
+            self._preview = self._make_preview(first_user) if first_user is not None else 'New Chat'
+            return self.current_messages
         return []
     
     def get_conversation_context(self, limit=6):
         return self.current_messages[-limit:] if self.current_messages else []
     
     def delete_chat(self, chat_id):
-        filepath = self.history_path / f"{chat_id}.json"
+        self.wait_for_saves()
+        filepath = self._log_path(chat_id)
         if filepath.exists():
             filepath.unlink()
+            self._meta_path(chat_id).unlink(missing_ok=True)
+            self._recent_cache = (None, None)
             if self.current_chat_id == chat_id:
                 self.current_chat_id = None
                 self.current_messages = []
+                self._preview = 'New Chat'
             return True
         return False
 
@@ -359,10 +730,37 @@ class ChatHistory:
 # DOCUMENT PROCESSOR
 # ==============================================================================
 
+def _page_text(page):
+    import fitz
+    # Plain text in content-stream order: no reading-order sort, ligatures expanded
+    return page.get_text("text", flags=fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP, sort=False)
+
+def _open_pdf(source):
+    """`source` is a file path (opened by PyMuPDF directly) or the raw PDF bytes."""
+    import fitz
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
 class DocumentProcessor:
+    DOC_TYPE_KEYWORDS = (
+        ("Investment Fund Document", ('fund', 'investment', 'investor', 'subscription')),
+        ("Sukuk/Debt Instrument Document", ('sukuk', 'bond', 'debt instrument')),
+        ("Licensing Document", ('license', 'licensing', 'authorization')),
+        ("Contract/Agreement", ('contract', 'agreement', 'party', 'parties')),
+        ("Securities Prospectus", ('prospectus', 'offering', 'securities')),
+    )
+    # One alternation with a named group per document type (t0 has the highest priority)
+    DOC_TYPE_RE = re.compile('|'.join(
+        f"(?P<t{i}>{'|'.join(map(re.escape, keywords))})" for i, (_, keywords) in enumerate(DOC_TYPE_KEYWORDS)
+    ), re.IGNORECASE)
+    PAGE_SEPARATOR = "\n\n"
+    ARABIC_RE = re.compile(r'[\u0600-\u06FF]')
+
     def __init__(self):
         self.current_document = None
         self.current_text = None
+        self.current_pages = []
         self.current_filename = None
         self.current_page_count = 0
     
@@ -370,54 +768,63 @@ class DocumentProcessor:
         if HAS_PYMUPDF is None:
             check_optional_imports()
         try:
+            # A path is handed to the parsers as-is so nothing is read into memory up front;
+            # only uploads from the UI arrive as base64 and need decoding
             if file_data:
-                data = base64.b64decode(file_data)
+                source = base64.b64decode(file_data)
                 ext = filename.lower().split('.')[-1] if filename else ''
             elif file_path:
-                with open(file_path, 'rb') as f:
-                    data = f.read()
-                ext = file_path.lower().split('.')[-1]
-                filename = os.path.basename(file_path)
+                source = os.fspath(file_path)
+                ext = source.lower().split('.')[-1]
+                filename = os.path.basename(source)
             else:
                 return {'error': 'No file provided'}
             if ext == 'pdf':
-                return self._process_pdf(data, filename)
+                return self._process_pdf(source, filename)
             elif ext in ['docx', 'doc']:
-                return self._process_docx(data, filename)
+                return self._process_docx(source, filename)
             else:
                 return {'error': f'Unsupported file type: {ext}'}
         except Exception as e:
             return {'error': str(e)}
     
-    def _process_pdf(self, data, filename):
+    def _process_pdf(self, source, filename):
         if not HAS_PYMUPDF:
             return {'error': 'PDF support not available. Install PyMuPDF: pip install PyMuPDF'}
-        import fitz
         try:
-            doc = fitz.open(stream=data, filetype="pdf")
+            doc = _open_pdf(source)
             if doc.page_count > MAX_DOCUMENT_PAGES:
                 return {'error': f'Document too large. Maximum {MAX_DOCUMENT_PAGES} pages allowed.'}
-            text_parts = []
-            for page_num, page in enumerate(doc):
-                text = page.get_text()
-                if text.strip():
-                    text_parts.append(f"[Page {page_num + 1}]\n{text}")
-            full_text = "\n\n".join(text_parts)
+            pages = [f"[Page {page_num}]\n{text}" for page_num, text in self._iter_pages(doc)]
+            self._set_pages(pages)
             self.current_document = doc
-            self.current_text = full_text
             self.current_filename = filename
             self.current_page_count = doc.page_count
-            summary = self._generate_quick_summary(full_text, filename)
-            return {'success': True, 'filename': filename, 'pages': doc.page_count, 'chars': len(full_text), 'summary': summary}
+            summary = self._generate_quick_summary(pages, filename)
+            return {'success': True, 'filename': filename, 'pages': doc.page_count, 'chars': self._joined_length(pages), 'summary': summary}
         except Exception as e:
             return {'error': f'Failed to process PDF: {str(e)}'}
     
-    def _process_docx(self, data, filename):
+    def _iter_pages(self, doc):
+        """Yield (page_number, text) for every non-empty page, in order."""
+        # Serial on purpose: MuPDF is not thread-safe, get_text holds the GIL, and uploads are capped at MAX_DOCUMENT_PAGES
+        for page_num, text in enumerate(map(_page_text, doc), 1):
+            if text.strip():
+                yield page_num, text
+
+    def _joined_length(self, parts):
+        return sum(map(len, parts)) + len(self.PAGE_SEPARATOR) * max(len(parts) - 1, 0)
+
+    def _set_pages(self, pages):
+        self.current_pages = pages
+        self.current_text = None
+
+    def _process_docx(self, source, filename):
         if not HAS_DOCX:
             return {'error': 'DOCX support not available. Install python-docx: pip install python-docx'}
         from docx import Document as DocxDocument
         try:
-            doc = DocxDocument(BytesIO(data))
+            doc = DocxDocument(source if isinstance(source, str) else BytesIO(source))
             text_parts = []
             for para in doc.paragraphs:
                 if para.text.strip():
@@ -427,37 +834,48 @@ class DocumentProcessor:
                     row_text = ' | '.join(cell.text.strip() for cell in row.cells if cell.text.strip())
                     if row_text:
                         text_parts.append(row_text)
-            full_text = "\n\n".join(text_parts)
-            self.current_text = full_text
+            self._set_pages(text_parts)
             self.current_filename = filename
             self.current_page_count = len(text_parts) // 20 + 1
-            summary = self._generate_quick_summary(full_text, filename)
-            return {'success': True, 'filename': filename, 'pages': self.current_page_count, 'chars': len(full_text), 'summary': summary}
+            summary = self._generate_quick_summary(text_parts, filename)
+            return {'success': True, 'filename': filename, 'pages': self.current_page_count, 'chars': self._joined_length(text_parts), 'summary': summary}
         except Exception as e:
             return {'error': f'Failed to process DOCX: {str(e)}'}
     
-    def _generate_quick_summary(self, text, filename):
-        text_lower = text.lower()
-        doc_type = "Document"
-        if any(kw in text_lower for kw in ['fund', 'investment', 'investor', 'subscription']):
-            doc_type = "Investment Fund Document"
-        elif any(kw in text_lower for kw in ['sukuk', 'bond', 'debt instrument']):
-            doc_type = "Sukuk/Debt Instrument Document"
-        elif any(kw in text_lower for kw in ['license', 'licensing', 'authorization']):
-            doc_type = "Licensing Document"
-        elif any(kw in text_lower for kw in ['contract', 'agreement', 'party', 'parties']):
-            doc_type = "Contract/Agreement"
-        elif any(kw in text_lower for kw in ['prospectus', 'offering', 'securities']):
-            doc_type = "Securities Prospectus"
-        has_arabic = bool(re.search(r'[\u0600-\u06FF]', text))
-        return {'type': doc_type, 'has_arabic': has_arabic, 'word_count': len(text.split())}
+    def _generate_quick_summary(self, pages, filename):
+        """Single pass over the pages; nothing is concatenated."""
+        if isinstance(pages, str):
+            pages = (pages,)
+        matched = [False] * len(self.DOC_TYPE_KEYWORDS)
+        has_arabic = False
+        word_count = 0
+        for page in pages:
+            if not matched[0]:
+                for m in self.DOC_TYPE_RE.finditer(page):
+                    i = int(m.lastgroup[1:])
+                    matched[i] = True
+                    if i == 0:
+                        break
+            if not has_arabic:
+                has_arabic = self.ARABIC_RE.search(page) is not None
+            word_count += len(page.split())
+        doc_type = next((name for (name, _), hit in zip(self.DOC_TYPE_KEYWORDS, matched) if hit), "Document")
+        return {'type': doc_type, 'has_arabic': has_arabic, 'word_count': word_count}
     
+    def iter_text(self):
+        """Iterate the current document page by page."""
+        return iter(self.current_pages)
+
     def get_current_text(self):
+        # Joined on demand; only the executive brief needs the whole text at once
+        if self.current_text is None and self.current_pages:
+            self.current_text = self.PAGE_SEPARATOR.join(self.current_pages)
         return self.current_text
     
     def clear(self):
         self.current_document = None
         self.current_text = None
+        self.current_pages = []
         self.current_filename = None
         self.current_page_count = 0
 
@@ -475,38 +893,79 @@ class ComplianceChecker:
         'disclosure_requirements': {'name': 'Disclosure Requirements', 'keywords': ['disclosure', 'material information', 'إفصاح'], 'regulation': 'CMA Rules on Offer of Securities, Article 30', 'description': 'Issuers must disclose all material information'}
     }
     
+    def __init__(self):
+        # Every keyword gets one bit; a scan ORs bits into a single int mask
+        self._keywords = [kw for category in self.COMPLIANCE_CATEGORIES.values() for kw in category['keywords']]
+        self._keyword_bits = {kw: 1 << i for i, kw in enumerate(self._keywords)}
+        self._all_bits = (1 << len(self._keywords)) - 1
+        # Case-insensitive search needs no lowered copy of the page; found keywords are skipped on later pages
+        self._keyword_res = [(1 << i, re.compile(re.escape(kw), re.IGNORECASE)) for i, kw in enumerate(self._keywords)]
+
     def check_compliance(self, text, filename=None):
+        """`text` may be a string or an iterable of page strings."""
         results = {'filename': filename or 'Document', 'timestamp': datetime.now().isoformat(), 'checks': [], 'summary': {'compliant': 0, 'warnings': 0, 'missing': 0}}
-        text_lower = text.lower()
+        mask = 0
+        for chunk in ((text,) if isinstance(text, str) else text):
+            for bit, pattern in self._keyword_res:
+                if not mask & bit and pattern.search(chunk):
+                    mask |= bit
+            if mask == self._all_bits:
+                break
+        compliant = 0
         for category_id, category in self.COMPLIANCE_CATEGORIES.items():
-            found_keywords = [kw for kw in category['keywords'] if kw.lower() in text_lower or kw in text]
-            if found_keywords:
-                status = 'compliant'
-                results['summary']['compliant'] += 1
-                detail = f"Found references: {', '.join(found_keywords[:3])}"
-            else:
-                status = 'warning'
-                results['summary']['warnings'] += 1
-                detail = f"Consider adding {category['name'].lower()} information"
+            found_keywords = [kw for kw in category['keywords'] if mask & self._keyword_bits[kw]]
+            hit = int(bool(found_keywords))
+            compliant += hit
+            status = 'compliant' if hit else 'warning'
+            detail = f"Found references: {', '.join(found_keywords[:3])}" if hit else f"Consider adding {category['name'].lower()} information"
             results['checks'].append({'id': category_id, 'name': category['name'], 'status': status, 'regulation': category['regulation'], 'description': category['description'], 'detail': detail})
-        total = results['summary']['compliant'] + results['summary']['warnings']
-        results['score'] = round((results['summary']['compliant'] / total) * 100) if total > 0 else 100
+        total = len(self.COMPLIANCE_CATEGORIES)
+        results['summary']['compliant'] = compliant
+        results['summary']['warnings'] = total - compliant
+        results['score'] = round((compliant / total) * 100) if total > 0 else 100
         return results
 
 # ==============================================================================
 # CHAT EXPORTER
 # ==============================================================================
 
+_PDF_STYLES = None
+
+def get_pdf_styles():
+    """ReportLab sample sheet plus the export styles, built on first use and shared by every PDF export."""
+    global _PDF_STYLES
+    if _PDF_STYLES is None:
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.enums import TA_CENTER
+        styles = getSampleStyleSheet()
+        styles.add(ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24, spaceAfter=20, textColor=colors.HexColor('#00d4aa')))
+        styles.add(ParagraphStyle('CustomNormal', parent=styles['Normal'], fontSize=11, leading=16))
+        styles.add(ParagraphStyle('CustomRole', parent=styles['Normal'], fontSize=10, textColor=colors.HexColor('#00d4aa'), fontName='Helvetica-Bold', spaceBefore=15))
+        styles.add(ParagraphStyle('CustomFooter', parent=styles['Normal'], fontSize=8, textColor=colors.grey, alignment=TA_CENTER))
+        styles.add(ParagraphStyle('Sources', parent=styles['Normal'], fontSize=9, textColor=colors.grey))
+        styles.add(ParagraphStyle(name='BriefTitle', parent=styles['Heading1'], fontSize=20, spaceAfter=20, textColor=colors.HexColor('#00d4aa')))
+        styles.add(ParagraphStyle(name='BriefHeader', parent=styles['Heading2'], fontSize=14, spaceBefore=15, spaceAfter=10, textColor=colors.HexColor('#2c3e50')))
+        styles.add(ParagraphStyle('ComplianceTitle', parent=styles['Heading1'], fontSize=22, alignment=0, spaceAfter=10, textColor=colors.HexColor('#00d4aa')))
+        _PDF_STYLES = styles
+    return _PDF_STYLES
+
 class ChatExporter:
+    _BOLD_RE = re.compile(r'\*\*([^*]+)\*\*')
+    _ITALIC_RE = re.compile(r'\*([^*]+)\*')
+    _HEADING_RE = re.compile(r'^#+\s*', re.MULTILINE)
+    _BULLET_RE = re.compile(r'^[\-\*]\s+', re.MULTILINE)
+    _ANGLE_TABLE = str.maketrans({'<': '(', '>': ')'})
+    _HEADER_EMOJI_TABLE = str.maketrans('', '', '🚨💰📅')
+
     def _sanitize_for_pdf(self, text):
         import html
         text = html.escape(text)
-        text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-        text = re.sub(r'\*([^*]+)\*', r'\1', text)
-        text = re.sub(r'^#+\s*', '', text, flags=re.MULTILINE)
-        text = re.sub(r'^[\-\*]\s+', '- ', text, flags=re.MULTILINE)
-        text = text.replace('<', '(').replace('>', ')')
-        return text
+        text = self._BOLD_RE.sub(r'\1', text)
+        text = self._ITALIC_RE.sub(r'\1', text)
+        text = self._HEADING_RE.sub('', text)
+        text = self._BULLET_RE.sub('- ', text)
+        return text.translate(self._ANGLE_TABLE)
     
     def export_markdown(self, messages, filename=None):
         if not messages:
@@ -533,18 +992,16 @@ class ChatExporter:
             return None, "PDF export not available. Install reportlab: pip install reportlab"
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         from reportlab.lib.units import cm
         from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
-        from reportlab.lib.enums import TA_CENTER
         try:
             buffer = BytesIO()
             doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
-            styles = getSampleStyleSheet()
-            title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24, spaceAfter=20, textColor=colors.HexColor('#00d4aa'))
-            normal_style = ParagraphStyle('CustomNormal', parent=styles['Normal'], fontSize=11, leading=16)
-            role_style = ParagraphStyle('CustomRole', parent=styles['Normal'], fontSize=10, textColor=colors.HexColor('#00d4aa'), fontName='Helvetica-Bold', spaceBefore=15)
-            footer_style = ParagraphStyle('CustomFooter', parent=styles['Normal'], fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
+            styles = get_pdf_styles()
+            title_style = styles['CustomTitle']
+            normal_style = styles['CustomNormal']
+            role_style = styles['CustomRole']
+            footer_style = styles['CustomFooter']
             story = [Paragraph("TadqeeqAI Chat Export", title_style), Paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y at %H:%M')}", styles['Normal']), HRFlowable(width="100%", thickness=1, color=colors.HexColor('#e0e0e0')), Spacer(1, 20)]
             for msg in messages:
                 role = "You" if msg['role'] == 'user' else "TadqeeqAI"
@@ -560,13 +1017,13 @@ class ChatExporter:
                 story.append(Spacer(1, 10))
                 if msg.get('sources'):
                     sources_text = "Sources: " + ", ".join([s['article'] for s in msg['sources'][:3]])
-                    story.append(Paragraph(sources_text, ParagraphStyle('Sources', parent=styles['Normal'], fontSize=9, textColor=colors.grey)))
+                    story.append(Paragraph(sources_text, styles['Sources']))
                     story.append(Spacer(1, 5))
             story.extend([Spacer(1, 30), HRFlowable(width="100%", thickness=1, color=colors.HexColor('#e0e0e0')), Spacer(1, 10), Paragraph("Generated by TadqeeqAI v3.0", footer_style)])
             doc.build(story)
             pdf_data = buffer.getvalue()
             buffer.close()
-            return base64.b64encode(pdf_data).decode('utf-8'), None
+            return pdf_data, None
         except Exception as e:
             return None, f"PDF export failed: {str(e)}"
         
@@ -580,19 +1037,12 @@ class ChatExporter:
         
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
-        from io import BytesIO
-        import base64
-        import re
 
         try:
             buffer = BytesIO()
             doc = SimpleDocTemplate(buffer, pagesize=A4)
-            styles = getSampleStyleSheet()
-            # Custom Styles for the Report
-            styles.add(ParagraphStyle(name='BriefTitle', parent=styles['Heading1'], fontSize=20, spaceAfter=20, textColor=colors.HexColor('#00d4aa')))
-            styles.add(ParagraphStyle(name='BriefHeader', parent=styles['Heading2'], fontSize=14, spaceBefore=15, spaceAfter=10, textColor=colors.HexColor('#2c3e50')))
+            styles = get_pdf_styles()
             
             story = [Paragraph("Executive Brief", styles['BriefTitle']), HRFlowable(width="100%", thickness=1, color=colors.HexColor('#e0e0e0')), Spacer(1, 20)]
             
@@ -604,13 +1054,13 @@ class ChatExporter:
                 if line.startswith('# '): continue # Skip main title as we added it
                 
                 if line.startswith('## '):
-                    story.append(Paragraph(line.replace('## ', '').replace('🚨', '').replace('💰', '').replace('📅', '').strip(), styles['BriefHeader']))
+                    story.append(Paragraph(line.replace('## ', '').translate(self._HEADER_EMOJI_TABLE).strip(), styles['BriefHeader']))
                 elif line.startswith('* ') or line.startswith('- '):
                     # List items
-                    clean_line = re.sub(r'\*\*([^*]+)\*\*', r'<b>\1</b>', line[2:]) # Handle bold
+                    clean_line = self._BOLD_RE.sub(r'<b>\1</b>', line[2:]) # Handle bold
                     story.append(Paragraph(f"• {clean_line}", styles['Normal']))
                 else:
-                    clean_line = re.sub(r'\*\*([^*]+)\*\*', r'<b>\1</b>', line)
+                    clean_line = self._BOLD_RE.sub(r'<b>\1</b>', line)
                     story.append(Paragraph(clean_line, styles['Normal']))
                 
                 story.append(Spacer(1, 6))
@@ -618,10 +1068,300 @@ class ChatExporter:
             doc.build(story)
             pdf_data = buffer.getvalue()
             buffer.close()
-            return base64.b64encode(pdf_data).decode('utf-8'), None
+            return pdf_data, None
         except Exception as e:
             return None, str(e)
 
+# ==============================================================================
+# RETRIEVAL RECORDS
+# ==============================================================================
+
+@dataclass(slots=True)
+class RetrievedDoc:
+    """One regulation chunk as handed from search to prompt building."""
+    text: str
+    article: str
+    document: str
+    regulator: str
+    language: str
+    # Identifies the article across chunks and across the BM25/Chroma copies; used as the fusion key
+    key: int = 0
+    
+    @classmethod
+    def from_meta(cls, text, meta):
+        article, document = meta.get('article', ''), meta.get('document', '')
+        return cls(text, article, document, meta.get('regulator', ''), meta.get('language', ''), hash((document, article)))
+
+# Set-bit count for every byte value, used for Hamming distance over packed embeddings
+POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# ==============================================================================
+# BM25 INDEX
+# ==============================================================================
+
+class SparseBM25:
+    """BM25 with every (term, doc) weight precomputed into CSC arrays; a query is a few column gathers."""
+    ARRAYS = ('indptr', 'indices', 'weights')
+
+    def __init__(self, vocab, indptr, indices, weights, n_docs):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.n_docs = n_docs
+
+    @classmethod
+    def from_okapi(cls, bm25):
+        """Fold a fitted rank_bm25.BM25Okapi into per-term posting columns (same k1, b and idf floor)."""
+        k1, b = bm25.k1, bm25.b
+        postings = {}
+        for doc_id, (freqs, length) in enumerate(zip(bm25.doc_freqs, bm25.doc_len)):
+            norm = k1 * (1 - b + b * length / bm25.avgdl)
+            for term, tf in freqs.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(doc_id)
+                postings[term][1].append(tf * (k1 + 1) / (tf + norm))
+        vocab = {}
+        indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+        indices, weights = [], []
+        for col, (term, (docs, tfs)) in enumerate(postings.items()):
+            vocab[term] = col
+            indices.extend(docs)
+            weights.extend((bm25.idf.get(term) or 0) * np.asarray(tfs))
+            indptr[col + 1] = len(indices)
+        return cls(vocab, indptr, np.asarray(indices, dtype=np.int32), np.asarray(weights, dtype=np.float64), len(bm25.doc_len))
+
+    def save(self, path):
+        """One .npy per array so load() can memory-map them; vocab.json goes last and marks the set complete."""
+        path = Path(path)
+        path.mkdir(exist_ok=True)
+        for name in self.ARRAYS:
+            tmp_path = path / f'{name}.tmp.npy'
+            np.save(tmp_path, getattr(self, name))
+            os.replace(tmp_path, path / f'{name}.npy')
+        tmp_path = path / 'vocab.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(json_dumpb({'n_docs': self.n_docs, 'nnz': len(self.indices), 'vocab': self.vocab}))
+        os.replace(tmp_path, path / 'vocab.json')
+
+    @classmethod
+    def load(cls, path):
+        """Arrays come back read-only memory-mapped; the OS pages in only the columns queries touch."""
+        path = Path(path)
+        with open(path / 'vocab.json', 'rb') as f:
+            meta = json_loads(f.read())
+        arrays = {name: np.load(path / f'{name}.npy', mmap_mode='r') for name in cls.ARRAYS}
+        if len(arrays['indices']) != meta['nnz'] or len(arrays['indptr']) != len(meta['vocab']) + 1:
+            raise ValueError('BM25 cache arrays do not match vocab.json')
+        return cls(meta['vocab'], arrays['indptr'], arrays['indices'], arrays['weights'], meta['n_docs'])
+
+    def get_scores(self, tokens):
+        scores = np.zeros(self.n_docs)
+        for token in tokens:
+            col = self.vocab.get(token)
+            if col is None:
+                continue
+            start, stop = self.indptr[col], self.indptr[col + 1]
+            # Doc ids are unique within a column, so a fancy-index add is safe
+            scores[self.indices[start:stop]] += self.weights[start:stop]
+        return scores
+
+    def search(self, tokens, top_k=None, mask=None):
+        """Doc ids with a positive score (restricted to `mask` if given), best first, and their scores."""
+        scores = self.get_scores(tokens)
+        hits = np.flatnonzero((scores > 0) & mask if mask is not None else scores > 0)
+        if top_k is not None and len(hits) > top_k:
+            hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+        hits = hits[np.argsort(-scores[hits], kind='stable')]
+        return hits, scores[hits]
+
+# ==============================================================================
+# SEMANTIC CACHE
+# ==============================================================================
+
+class SemanticCache:
+    """Bounded LRU keyed by query embeddings; a hit is any entry above a cosine threshold."""
+    
+    def __init__(self, maxsize=SEMANTIC_CACHE_SIZE, threshold=SEMANTIC_CACHE_THRESHOLD):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._counter = 0
+    
+    @staticmethod
+    def normalize(embedding):
+        vec = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+    
+    def _matrix(self, bucket):
+        # Stacked lazily so a burst of inserts only pays for one rebuild
+        if bucket['matrix'] is None:
+            bucket['keys'] = list(bucket['entries'])
+            bucket['matrix'] = np.stack([bucket['entries'][k][0] for k in bucket['keys']])
+        return bucket['matrix']
+    
+    def get(self, embedding, scope=None, threshold=None):
+        q = self.normalize(embedding)
+        with self._lock:
+            bucket = self._buckets.get(scope)
+            if not bucket or not bucket['entries']:
+                return None
+            sims = self._matrix(bucket) @ q
+            best = int(np.argmax(sims))
+            if sims[best] < (self.threshold if threshold is None else threshold):
+                return None
+            key = bucket['keys'][best]
+            bucket['entries'].move_to_end(key)
+            return bucket['entries'][key][1]
+    
+    def put(self, embedding, value, scope=None):
+        q = self.normalize(embedding)
+        with self._lock:
+            bucket = self._buckets.setdefault(scope, {'entries': OrderedDict(), 'keys': None, 'matrix': None})
+            self._counter += 1
+            bucket['entries'][self._counter] = (q, value)
+            if len(bucket['entries']) > self.maxsize:
+                bucket['entries'].popitem(last=False)
+            bucket['matrix'] = None
+    
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+# ==============================================================================
+# MICRO-BATCHING
+# ==============================================================================
+
+class MicroBatcher:
+    """Background worker that gathers requests arriving within `max_wait_ms` of each other and processes them as one batch."""
+    
+    def __init__(self, max_batch, max_wait_ms):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+    
+    def submit(self, item):
+        future = Future()
+        self._queue.put((item, future))
+        return future.result()
+    
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _process(self, batch):
+        """Resolve every (item, future) pair in `batch`."""
+        raise NotImplementedError
+    
+    def _run(self):
+        while True:
+            self._process(self._collect())
+
+class EmbeddingBatcher(MicroBatcher):
+    """Coalesces concurrent single-text encode calls into one batched forward pass."""
+    BUCKETS = (16, 32, 64, 128)
+    
+    def __init__(self, model, max_batch=16, max_wait_ms=8):
+        self.model = model
+        super().__init__(max_batch, max_wait_ms)
+    
+    def encode(self, text):
+        return self.submit(text)
+    
+    def _bucket(self, text):
+        words = len(text.split())
+        for i, limit in enumerate(self.BUCKETS):
+            if words <= limit:
+                return i
+        return len(self.BUCKETS)
+    
+    def _encode(self, batch):
+        # Neighbouring lengths keep padding inside the batch to a minimum
+        batch.sort(key=lambda item: len(item[0]))
+        texts = [text for text, _ in batch]
+        try:
+            vectors = self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True, normalize_embeddings=True)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), vec in zip(batch, vectors):
+            future.set_result(vec)
+    
+    def _process(self, batch):
+        buckets = {}
+        for item in batch:
+            buckets.setdefault(self._bucket(item[0]), []).append(item)
+        # One forward pass per length class so a long text doesn't pad every short one
+        for bucket in buckets.values():
+            self._encode(bucket)
+
+class ChromaQueryBatcher(MicroBatcher):
+    """Coalesces concurrent single-vector Chroma queries; requests sharing a filter and size become one multi-vector query."""
+    INCLUDE = ['documents', 'metadatas', 'distances']
+    
+    def __init__(self, collection, max_batch=8, max_wait_ms=5):
+        self.collection = collection
+        super().__init__(max_batch, max_wait_ms)
+    
+    def query(self, embedding, where, n_results):
+        """Same shape as collection.query for a single query vector."""
+        return self.submit((embedding, where, n_results))
+    
+    def _process(self, batch):
+        groups = {}
+        for (embedding, where, n_results), future in batch:
+            # Filters are dicts, so their serialized form is the grouping key
+            groups.setdefault((json_dumps(where), n_results), []).append((embedding, where, future))
+        for (_, n_results), items in groups.items():
+            try:
+                res = self.collection.query(query_embeddings=np.stack([item[0] for item in items]), n_results=n_results, where=items[0][1], include=self.INCLUDE)
+            except Exception as e:
+                for _, _, future in items:
+                    future.set_exception(e)
+                continue
+            for i, (_, _, future) in enumerate(items):
+                future.set_result({key: [res[key][i]] if res.get(key) else res.get(key) for key in self.INCLUDE})
+
+# ==============================================================================
+# KEYWORD MATCHING
+# ==============================================================================
+
+class KeywordMatcher:
+    """Finds which of many phrases occur in a text in one pass (Aho-Corasick when pyahocorasick is installed)."""
+    
+    def __init__(self, phrases):
+        # phrase -> tags it stands for; a phrase may belong to several tables
+        tags_by_phrase = {}
+        for phrase, tag in phrases:
+            tags_by_phrase.setdefault(phrase, []).append(tag)
+        self._phrases = {phrase: tuple(tags) for phrase, tags in tags_by_phrase.items()}
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for phrase, tags in self._phrases.items():
+                self._automaton.add_word(phrase, tags)
+            self._automaton.make_automaton()
+    
+    def find(self, text):
+        """Tags of every phrase that occurs in `text` as a plain substring."""
+        if self._automaton is not None:
+            return {tag for _, tags in self._automaton.iter(text) for tag in tags}
+        return {tag for phrase, tags in self._phrases.items() if phrase in text for tag in tags}
+
 # ==============================================================================
 # END OF PART 1 - PART 2 CONTAINS: TadqeeqRAG class and API class
 # ==============================================================================
@@ -632,12 +1372,97 @@ class TadqeeqRAG:
     _instance = None
     _initialized = False
     _init_error = None
+    _instance_lock = threading.Lock()
+    # Set once initialize() has finished, successfully or not
+    _ready_event = threading.Event()
+    
+    # Static instructions go to Ollama as the system prompt; keeping them byte-identical lets it reuse the prefix KV cache
+    _PROMPT_ROLE_AR = "أنت مساعد قانوني متخصص في الأنظمة المالية السعودية (ساما وهيئة السوق المالية).\n\n"
+    _PROMPT_ROLE_EN = "You are a legal assistant specializing in Saudi Arabian financial regulations (SAMA and CMA).\n\n"
+    PROMPT_SYSTEM = {
+        ('ar', False): _PROMPT_ROLE_AR + """تعليمات مهمة:
+- اقرأ كل مستند بعناية قبل الإجابة
+- استخرج المعلومات المطلوبة من المستندات
+- اذكر رقم المادة عند الاستشهاد (مثال: المادة 22)
+- مصطلح "debt instruments" يعني "الصكوك" أو "أدوات الدين"
+- اكتب الأرقام والمبالغ كما هي في المستند
+- استخدم تنسيق Markdown: استخدم **نص** للتأكيد و - للقوائم
+- إذا لم تجد المعلومة المحددة، قل ذلك بوضوح
+- لا تذكر أنك ستساعد في نهاية الإجابة""",
+        ('en', False): _PROMPT_ROLE_EN + """Important instructions:
+- Read each document carefully before answering
+- Extract the relevant information from the documents
+- Cite the Article number when referencing information (e.g., "Article 22")
+- "Sukuk" and "debt instruments" refer to the same thing
+- Preserve exact numbers and amounts as written in the documents
+- Use Markdown formatting: **bold** for emphasis and - for lists
+- If the specific information is not found, say so clearly
+- Do not offer further assistance at the end of your response""",
+        ('ar', True): _PROMPT_ROLE_AR + """المستخدم يطلب توضيحاً أو تبسيطاً. قم بما يلي:
+- إذا طلب تبسيط: اشرح المفهوم بلغة سهلة وواضحة
+- إذا طلب مثال: قدم سيناريو عملي يوضح التطبيق
+- إذا طلب توضيح: اشرح النقاط الغامضة بالتفصيل""",
+        ('en', True): _PROMPT_ROLE_EN + """The user is asking for clarification or simplification. Do the following:
+- If they want simplification: Explain the concept in plain, easy-to-understand language
+- If they want examples: Provide a practical scenario showing how this applies
+- If they want clarification: Explain the unclear points in detail""",
+    }
+    PROMPT_LABELS = {
+        'ar': {'history': "المحادثة السابقة:\n", 'docs': "المستندات المرجعية:\n", 'question': "\n\nالسؤال: ", 'request': "\n\nطلب المستخدم: ", 'answer': "\n\nالإجابة:"},
+        'en': {'history': "Previous conversation:\n", 'docs': "Reference Documents:\n", 'question': "\n\nQuestion: ", 'request': "\n\nUser request: ", 'answer': "\n\nAnswer:"},
+    }
+    # The model sometimes keeps going and invents the next turn; stop as soon as it echoes a prompt label
+    PROMPT_STOP = ["\n\nQuestion:", "\n\nUser request:", "\nUser:", "\n\nالسؤال:", "\n\nطلب المستخدم:"]
+    # Runs rather than single characters: far fewer match objects for the same count
+    _ARABIC_CHAR_RE = re.compile(r'[\u0600-\u06FF]+')
+    _BM25_TOKEN_RE = re.compile(r'[\u0600-\u06FF]+|[a-zA-Z]+|\d+')
+    # Substring cues for routing a question to a regulator; English entries are matched against the lowered query
+    REGULATOR_KEYWORDS = {
+        'SAMA': ['sama', 'finance company', 'finance companies', 'financing company', 'licensing fee', 'real estate finance', 'mortgage', 'microfinance', 'finance control', 'monetary authority', 'bank', 'banking',
+                 'ساما', 'شركة التمويل', 'شركات التمويل', 'رسوم الترخيص', 'التمويل العقاري', 'التمويل الأصغر', 'مؤسسة النقد', 'البنك المركزي', 'تمويل'],
+        'CMA': ['cma', 'capital market', 'securities', 'sukuk', 'debt instrument', 'investment fund', 'qualified investor', 'public offering', 'ipo', 'private placement', 'prospectus', 'listing', 'merger', 'acquisition', 'stock', 'shares', 'exchange',
+                'مستثمر مؤهل', 'المستثمر المؤهل', 'هيئة السوق المالية', 'هيئة السوق', 'صكوك', 'الصكوك', 'طرح عام', 'طرح خاص', 'نشرة الإصدار', 'صناديق الاستثمار', 'أوراق مالية', 'الأوراق المالية', 'سوق المال', 'الاندماج', 'الاستحواذ', 'الأسهم', 'التداول'],
+    }
+    # Arabic phrase -> English terms appended so the English index can answer Arabic questions
+    ARABIC_TRANSLATIONS = {
+        'رسوم الترخيص': 'licensing fees', 'رسوم ترخيص': 'licensing fees', 'شركات التمويل': 'finance companies',
+        'شركة التمويل': 'finance company', 'التمويل العقاري': 'real estate finance', 'التمويل الأصغر': 'microfinance',
+        'المستثمر المؤهل': 'qualified investor', 'مستثمر مؤهل': 'qualified investor', 'الصكوك': 'sukuk debt instruments',
+        'صكوك': 'sukuk debt instruments', 'أدوات الدين': 'debt instruments', 'طرح عام': 'public offering',
+        'طرح خاص': 'private placement', 'نشرة الإصدار': 'prospectus', 'صناديق الاستثمار': 'investment funds',
+        'صندوق استثمار': 'investment fund', 'رأس المال': 'capital requirements', 'متطلبات رأس المال': 'capital requirements',
+        'الحد الأدنى': 'minimum requirements', 'هيئة السوق المالية': 'capital market authority CMA',
+        'مؤسسة النقد': 'SAMA monetary authority', 'ساما': 'SAMA', 'الاندماج': 'merger', 'الاستحواذ': 'acquisition',
+        'الأسهم': 'shares stocks', 'الإفصاح': 'disclosure', 'الحوكمة': 'governance', 'مجلس الإدارة': 'board of directors',
+        'تقرير سنوي': 'annual report', 'القوائم المالية': 'financial statements', 'المراجع الخارجي': 'external auditor',
+        'العقوبات': 'penalties', 'المخالفات': 'violations', 'الترخيص': 'license licensing', 'التسجيل': 'registration',
+        'الإدراج': 'listing', 'السوق الموازية': 'parallel market', 'الطرح': 'offering', 'الاكتتاب': 'subscription IPO',
+    }
+    # Lowered phrase -> synonyms appended before searching
+    QUERY_EXPANSIONS = {
+        'sukuk': 'debt instruments securities bonds', 'sukuk issuance': 'debt instruments offering securities',
+        'debt instruments': 'sukuk securities bonds', 'licensing fee': 'license fee financial consideration',
+        'licensing fees': 'license fee financial consideration', 'qualified investor': 'accredited investor',
+        'capital requirements': 'minimum capital paid up capital', 'finance company': 'finance companies',
+        'microfinance': 'micro finance small finance', 'real estate finance': 'mortgage property finance',
+        'investment fund': 'investment funds', 'public offering': 'IPO offering securities', 'private placement': 'exempt offering',
+    }
+    # The executive brief pulls the chunks closest to each of these
+    BRIEF_TARGETS = [
+        "What are the key risks, violations, penalties, and compliance red flags?",
+        "What are the fees, capital requirements, costs, and financial obligations?",
+        "What are the effective dates, deadlines, submission timelines, and expiry dates?"
+    ]
     
     @classmethod
     def get_instance(cls):
-        if cls._instance is None:
-            cls._instance = cls()
-        return cls._instance
+        instance = cls._instance
+        if instance is not None:
+            return instance
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
     
     @classmethod
     def is_ready(cls):
@@ -645,14 +1470,48 @@ class TadqeeqRAG:
     
     def __init__(self):
         self.documents = None
+        self._reg_arr = None
+        self._lang_arr = None
         self.bm25 = None
         self.embedder = None
+        self.batcher = None
+        self.embed_batch_size = EMBED_BATCH_SIZE_CPU
+        self.chroma_batcher = None
+        # Runs the semantic leg of hybrid_search while the calling thread does BM25
+        self._search_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='search')
         self.client = None
         self.collection = None
+        self.answer_collection = None
+        self.corpus_digest = None
+        self._doc_positions = {}
+        self.emb_matrix = None
+        self.emb_bin = None
+        self.emb_mean = None
+        self.emb_records = None
+        self.emb_partitions = None
+        self.llm = None
         self.chat_history = None
         self.doc_processor = None
         self.compliance_checker = None
         self.chat_exporter = None
+        self.query_cache = SemanticCache()
+        # Exact-string hits (retries, "simplify", re-asked questions) skip the forward pass entirely
+        self._encode_query = functools.lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)(self._embed_query)
+        self.brief_target_embeddings = None
+        self._chunk_emb_cache = OrderedDict()
+        self._chunk_emb_lock = threading.Lock()
+        # One automaton for regulator cues, translations and expansions; the tag says which table a hit came from
+        self._translations = list(self.ARABIC_TRANSLATIONS.values())
+        self._expansions = list(self.QUERY_EXPANSIONS.values())
+        self.keyword_matcher = KeywordMatcher(
+            [(kw, ('regulator', reg)) for reg, kws in self.REGULATOR_KEYWORDS.items() for kw in kws]
+            + [(ar, ('translation', i)) for i, ar in enumerate(self.ARABIC_TRANSLATIONS)]
+            + [(term, ('expansion', i)) for i, term in enumerate(self.QUERY_EXPANSIONS)]
+        )
+        # lru_cache locks internally, so concurrent prompt builds can share it
+        self._fragment = functools.lru_cache(maxsize=PROMPT_FRAGMENT_CACHE_SIZE)(self._render_fragment)
+        self._ctx_cache = OrderedDict()
+        self._ctx_lock = threading.Lock()
         self.stats = None
         self.sama_count = 0
         self.cma_count = 0
@@ -661,8 +1520,15 @@ class TadqeeqRAG:
     def initialize(self):
         """Initialize the RAG system with progress tracking."""
         global progress_tracker
+        # Documents, BM25, the embedder and Chroma don't depend on each other or on Ollama,
+        # so they load on worker threads while this thread brings Ollama up
+        pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='init')
         try:
             print("\nLoading TadqeeqAI v3.0...")
+            docs_future = pool.submit(self._load_documents)
+            bm25_future = pool.submit(self._load_bm25)
+            embedder_future = pool.submit(self._load_embedder)
+            chroma_future = pool.submit(self._open_chroma)
             
             # Stage 1: GPU Detection
             progress_tracker.set_stage('gpu_detect')
@@ -683,37 +1549,37 @@ class TadqeeqRAG:
                 progress_tracker.set_error('Ollama not found')
                 TadqeeqRAG._init_error = {'type': 'ollama_not_installed', 'message': 'Ollama is not installed.', 'download_url': OLLAMA_DOWNLOAD_URL}
                 return False
+            # One pooled keep-alive connection for every generate call; skip proxy env lookups for localhost
+            import httpx
+            import ollama
+            self.llm = ollama.Client(host=OLLAMA_HOST, timeout=180, trust_env=False, limits=httpx.Limits(max_connections=4, max_keepalive_connections=4))
             
-            # Stage 4: Load Documents
+            # Stages 4-7 report in order as their loaders finish
             progress_tracker.set_stage('documents')
-            with open(DOCS_PATH, 'r', encoding='utf-8') as f:
-                self.documents = json.load(f)
-            self.stats = {'SAMA': {'en': 0, 'ar': 0}, 'CMA': {'en': 0, 'ar': 0}}
-            for doc in self.documents:
-                reg = doc.get('regulator', 'CMA')
-                lang = doc.get('language', 'en')
-                self.stats[reg][lang] += 1
-            self.sama_count = self.stats['SAMA']['en'] + self.stats['SAMA']['ar']
-            self.cma_count = self.stats['CMA']['en'] + self.stats['CMA']['ar']
-            self.total = len(self.documents)
+            docs_future.result()
             progress_tracker.set_stage('documents', f'{self.total} articles')
             
-            # Stage 5: Load BM25
             progress_tracker.set_stage('bm25')
-            with open(BM25_PATH, 'rb') as f:
-                self.bm25 = pickle.load(f)
+            self.bm25 = bm25_future.result()
             
-            # Stage 6: Load Embeddings (LAZY IMPORT)
             progress_tracker.set_stage('embeddings')
-            from sentence_transformers import SentenceTransformer
-            self.embedder = SentenceTransformer(EMBEDDING_MODEL)
+            self.embedder = embedder_future.result()
+            self.batcher = EmbeddingBatcher(self.embedder)
             
-            # Stage 7: Connect to ChromaDB (LAZY IMPORT)
             progress_tracker.set_stage('chromadb')
-            import chromadb
-            self.client = chromadb.PersistentClient(path=CHROMA_PATH)
-            self.collection = self.client.get_collection("tadqeeq_v2")
+            chroma_future.result()
             progress_tracker.set_stage('chromadb', f'{self.collection.count()} vectors')
+            try:
+                # First HNSW query pays for loading the index segment; do it now rather than on the user's question
+                self.collection.query(query_embeddings=self.brief_target_embeddings[:1], n_results=1, include=[])
+            except Exception as e:
+                print(f"    ⚠ ChromaDB warmup failed: {e}")
+            try:
+                # Needs the corpus digest, so it waits for the documents stage
+                self.answer_collection = self._open_answer_cache()
+            except Exception as e:
+                print(f"    ⚠ Answer cache unavailable: {e}")
+                self.answer_collection = None
             
             # --- REMOVED STAGE 8 (LLM WARMUP) ---
             
@@ -733,20 +1599,100 @@ class TadqeeqRAG:
             progress_tracker.set_error(str(e))
             TadqeeqRAG._init_error = {'type': 'init_error', 'message': str(e)}
             return False
+        finally:
+            # On an early exit the loaders are abandoned rather than waited for
+            pool.shutdown(wait=False, cancel_futures=True)
     
+    def _load_documents(self):
+        # Raw bytes straight into orjson (when installed) instead of a decoded text stream into json
+        with open(DOCS_PATH, 'rb') as f:
+            raw = f.read()
+        # Content digest, not mtime: a frozen build unpacks documents.json afresh on every launch
+        self.corpus_digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        raw_documents = json_loads(raw)
+        self.stats = {'SAMA': {'en': 0, 'ar': 0}, 'CMA': {'en': 0, 'ar': 0}}
+        documents = []
+        reg_arr = np.empty(len(raw_documents), dtype=np.int8)
+        lang_arr = np.empty(len(raw_documents), dtype=np.int8)
+        # One pass fills the records, the filter codes and the stats
+        for i, doc in enumerate(raw_documents):
+            self.stats[doc.get('regulator', 'CMA')][doc.get('language', 'en')] += 1
+            record = RetrievedDoc.from_meta(doc.get('text', ''), doc)
+            documents.append(record)
+            reg_arr[i] = REGULATOR_CODES.get(record.regulator, -1)
+            lang_arr[i] = LANGUAGE_CODES.get(record.language, -1)
+        self.documents = documents
+        # Lets the answer cache store a turn's documents as corpus positions (valid while corpus_digest is unchanged)
+        self._doc_positions = {(d.document, d.article, d.text): i for i, d in enumerate(documents)}
+        self._reg_arr = reg_arr
+        self._lang_arr = lang_arr
+        self.sama_count = self.stats['SAMA']['en'] + self.stats['SAMA']['ar']
+        self.cma_count = self.stats['CMA']['en'] + self.stats['CMA']['ar']
+        self.total = len(self.documents)
+    
+    def _load_bm25(self):
+        # The pickle is only unpacked when it is newer than the persisted CSC arrays
+        try:
+            if (Path(BM25_CACHE_PATH) / 'vocab.json').stat().st_mtime >= os.stat(BM25_PATH).st_mtime:
+                return SparseBM25.load(BM25_CACHE_PATH)
+        except (OSError, ValueError):
+            pass
+        with open(BM25_PATH, 'rb') as f:
+            index = SparseBM25.from_okapi(pickle.load(f))
+        try:
+            index.save(BM25_CACHE_PATH)
+        except OSError as e:
+            print(f"    ⚠ BM25 cache not written: {e}")
+        return index
+    
+    def _load_embedder(self):
+        embedder = load_embedder()
+        if str(getattr(embedder, 'device', 'cpu')).startswith('cuda'):
+            self.embed_batch_size = EMBED_BATCH_SIZE_GPU
+        # The brief targets are constants: embedding them here also primes kernels and allocator before the first question
+        self.brief_target_embeddings = embedder.encode(self.BRIEF_TARGETS, batch_size=len(self.BRIEF_TARGETS), normalize_embeddings=True)
+        return embedder
+    
+    def _open_chroma(self):
+        import chromadb
+        self.client = chromadb.PersistentClient(path=CHROMA_PATH)
+        self.collection = self.client.get_collection("tadqeeq_v2")
+        if self.collection.count() <= MATRIX_SEARCH_MAX:
+            self._load_embedding_matrix()
+        else:
+            self.chroma_batcher = ChromaQueryBatcher(self.collection)
+    
+    def _open_answer_cache(self):
+        """Opens the persistent answer cache, emptying it when the corpus or either model has changed."""
+        import chromadb
+        # Kept outside CHROMA_PATH so the shipped regulation index is never written to
+        client = chromadb.PersistentClient(path=ANSWER_CACHE_PATH)
+        fingerprint = f"{EMBEDDING_MODEL}|{LLM_MODEL}|{self.corpus_digest}"
+        try:
+            collection = client.get_collection("tadqeeq_answers")
+        except Exception:
+            collection = None
+        # Checked before any create call: get_or_create may overwrite the stored metadata
+        if collection is not None and (collection.metadata or {}).get('fingerprint') != fingerprint:
+            client.delete_collection("tadqeeq_answers")
+            collection = None
+        if collection is None:
+            collection = client.create_collection("tadqeeq_answers", metadata={**ANSWER_CACHE_HNSW, 'fingerprint': fingerprint})
+        return collection
     
     def detect_language(self, text):
-        arabic_chars = len(re.findall(r'[\u0600-\u06FF]', text))
+        arabic_chars = sum(map(len, self._ARABIC_CHAR_RE.findall(text)))
         return 'ar' if arabic_chars > len(text) * 0.3 else 'en'
     
-    def detect_regulator(self, query):
-        q_lower = query.lower()
-        sama_en = ['sama', 'finance company', 'finance companies', 'financing company', 'licensing fee', 'real estate finance', 'mortgage', 'microfinance', 'finance control', 'monetary authority', 'bank', 'banking']
-        cma_en = ['cma', 'capital market', 'securities', 'sukuk', 'debt instrument', 'investment fund', 'qualified investor', 'public offering', 'ipo', 'private placement', 'prospectus', 'listing', 'merger', 'acquisition', 'stock', 'shares', 'exchange']
-        sama_ar = ['ساما', 'شركة التمويل', 'شركات التمويل', 'رسوم الترخيص', 'التمويل العقاري', 'التمويل الأصغر', 'مؤسسة النقد', 'البنك المركزي', 'تمويل']
-        cma_ar = ['مستثمر مؤهل', 'المستثمر المؤهل', 'هيئة السوق المالية', 'هيئة السوق', 'صكوك', 'الصكوك', 'طرح عام', 'طرح خاص', 'نشرة الإصدار', 'صناديق الاستثمار', 'أوراق مالية', 'الأوراق المالية', 'سوق المال', 'الاندماج', 'الاستحواذ', 'الأسهم', 'التداول']
-        sama_match = any(kw in q_lower for kw in sama_en) or any(kw in query for kw in sama_ar)
-        cma_match = any(kw in q_lower for kw in cma_en) or any(kw in query for kw in cma_ar)
+    def _keyword_hits(self, query):
+        # Lowering leaves Arabic untouched, so both languages are matched in one pass
+        return self.keyword_matcher.find(query.lower())
+    
+    def detect_regulator(self, query, found=None):
+        if found is None:
+            found = self._keyword_hits(query)
+        sama_match = ('regulator', 'SAMA') in found
+        cma_match = ('regulator', 'CMA') in found
         if sama_match and cma_match:
             return 'BOTH'
         elif sama_match:
@@ -755,214 +1701,244 @@ class TadqeeqRAG:
             return 'CMA'
         return 'BOTH'
     
-    def translate_arabic_query(self, query):
-        translations = {
-            'رسوم الترخيص': 'licensing fees', 'رسوم ترخيص': 'licensing fees', 'شركات التمويل': 'finance companies',
-            'شركة التمويل': 'finance company', 'التمويل العقاري': 'real estate finance', 'التمويل الأصغر': 'microfinance',
-            'المستثمر المؤهل': 'qualified investor', 'مستثمر مؤهل': 'qualified investor', 'الصكوك': 'sukuk debt instruments',
-            'صكوك': 'sukuk debt instruments', 'أدوات الدين': 'debt instruments', 'طرح عام': 'public offering',
-            'طرح خاص': 'private placement', 'نشرة الإصدار': 'prospectus', 'صناديق الاستثمار': 'investment funds',
-            'صندوق استثمار': 'investment fund', 'رأس المال': 'capital requirements', 'متطلبات رأس المال': 'capital requirements',
-            'الحد الأدنى': 'minimum requirements', 'هيئة السوق المالية': 'capital market authority CMA',
-            'مؤسسة النقد': 'SAMA monetary authority', 'ساما': 'SAMA', 'الاندماج': 'merger', 'الاستحواذ': 'acquisition',
-            'الأسهم': 'shares stocks', 'الإفصاح': 'disclosure', 'الحوكمة': 'governance', 'مجلس الإدارة': 'board of directors',
-            'تقرير سنوي': 'annual report', 'القوائم المالية': 'financial statements', 'المراجع الخارجي': 'external auditor',
-            'العقوبات': 'penalties', 'المخالفات': 'violations', 'الترخيص': 'license licensing', 'التسجيل': 'registration',
-            'الإدراج': 'listing', 'السوق الموازية': 'parallel market', 'الطرح': 'offering', 'الاكتتاب': 'subscription IPO',
-        }
-        result = query
-        for ar, en in translations.items():
-            if ar in query:
-                result = result + ' ' + en
-        return result if result != query else query
-    
-    def expand_query(self, query, lang):
-        q = query.lower()
-        mappings = {
-            'sukuk': 'debt instruments securities bonds', 'sukuk issuance': 'debt instruments offering securities',
-            'debt instruments': 'sukuk securities bonds', 'licensing fee': 'license fee financial consideration',
-            'licensing fees': 'license fee financial consideration', 'qualified investor': 'accredited investor',
-            'capital requirements': 'minimum capital paid up capital', 'finance company': 'finance companies',
-            'microfinance': 'micro finance small finance', 'real estate finance': 'mortgage property finance',
-            'investment fund': 'investment funds', 'public offering': 'IPO offering securities', 'private placement': 'exempt offering',
-        }
-        expansions = [exp for term, exp in mappings.items() if term in q]
+    def translate_arabic_query(self, query, found=None):
+        if found is None:
+            found = self._keyword_hits(query)
+        # Table order, so the appended text doesn't depend on match positions
+        hits = sorted(i for kind, i in found if kind == 'translation')
+        return query + ''.join(' ' + self._translations[i] for i in hits)
+    
+    def expand_query(self, query, lang, found=None):
+        if found is None:
+            found = self._keyword_hits(query)
+        expansions = [self._expansions[i] for i in sorted(i for kind, i in found if kind == 'expansion')]
         return query + ' ' + ' '.join(expansions) if expansions else query
     
     def bm25_search(self, query, regulator, language, top_k=15, force_english=False):
         search_lang = 'en' if force_english else language
-        tokens = re.findall(r'[\u0600-\u06FF]+|[a-zA-Z]+|\d+', query.lower())
+        tokens = self._BM25_TOKEN_RE.findall(query.lower())
         if not tokens:
             return []
-        scores = self.bm25.get_scores(tokens)
-        results = []
-        for idx in np.argsort(scores)[::-1]:
-            if len(results) >= top_k or idx >= len(self.documents):
-                continue
-            doc = self.documents[idx]
-            if regulator != 'BOTH' and doc.get('regulator') != regulator:
-                continue
-            if doc.get('language') != search_lang:
-                continue
-            if scores[idx] > 0:
-                results.append({'doc': doc, 'score': float(scores[idx]), 'source': 'bm25'})
-        return results
+        # Filters are applied before ranking, so only the top_k survivors are ever sorted
+        mask = self._lang_arr == LANGUAGE_CODES.get(search_lang, -1)
+        if regulator != 'BOTH':
+            mask &= self._reg_arr == REGULATOR_CODES.get(regulator, -1)
+        ids, scores = self.bm25.search(tokens, top_k, mask)
+        return [{'doc': self.documents[idx], 'score': score, 'source': 'bm25'} for idx, score in zip(ids.tolist(), scores.tolist())]
+    
+    def _load_embedding_matrix(self):
+        """Pull every vector out of Chroma once so small corpora are searched with a single matmul."""
+        # Paged reads: each page becomes a float32 block straight away instead of one giant list-of-lists
+        records, blocks = [], []
+        for offset in range(0, self.collection.count(), CHROMA_PAGE_SIZE):
+            page = self.collection.get(include=['embeddings', 'metadatas', 'documents'], limit=CHROMA_PAGE_SIZE, offset=offset)
+            records.extend(RetrievedDoc.from_meta(text, meta) for text, meta in zip(page['documents'], page['metadatas']))
+            blocks.append(np.asarray(page['embeddings'], dtype=np.float32))
+        # Rows sorted by (language, regulator) so every filter the UI can ask for is one contiguous slice
+        lang_codes = np.array([LANGUAGE_CODES.get(r.language, -1) for r in records], dtype=np.int8)
+        reg_codes = np.array([REGULATOR_CODES.get(r.regulator, -1) for r in records], dtype=np.int8)
+        order = np.lexsort((reg_codes, lang_codes))
+        lang_codes, reg_codes = lang_codes[order], reg_codes[order]
+        self.emb_records = [records[i] for i in order.tolist()]
+        partitions = {}
+        for lang, lang_code in LANGUAGE_CODES.items():
+            start, stop = np.searchsorted(lang_codes, [lang_code, lang_code + 1]).tolist()
+            partitions[('BOTH', lang)] = (start, stop)
+            for reg, reg_code in REGULATOR_CODES.items():
+                lo, hi = np.searchsorted(reg_codes[start:stop], [reg_code, reg_code + 1]).tolist()
+                partitions[(reg, lang)] = (start + lo, start + hi)
+        self.emb_partitions = partitions
+        matrix = np.concatenate(blocks)[order]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms > 0, norms, 1)
+        # fp32 stays the scoring copy; sign bits (32x smaller) only pick the shortlist in large partitions.
+        # e5 vectors share a strong common direction, so bits are taken around the corpus mean, not zero.
+        self.emb_matrix = matrix
+        self.emb_mean = matrix.mean(axis=0)
+        self.emb_bin = np.packbits(matrix > self.emb_mean, axis=1)
+    
+    def _matrix_search(self, embedding, regulator, search_lang, top_k):
+        start, stop = self.emb_partitions.get((regulator, search_lang), (0, 0))
+        if start == stop:
+            return []
+        q = SemanticCache.normalize(embedding)
+        shortlist = BINARY_SHORTLIST_FACTOR * top_k
+        if stop - start >= BINARY_SEARCH_MIN_ROWS and stop - start > shortlist:
+            # Slices are views, so only the shortlisted rows are ever copied
+            hamming = POPCOUNT_TABLE[np.bitwise_xor(self.emb_bin[start:stop], np.packbits(q > self.emb_mean))].sum(axis=1, dtype=np.uint32)
+            candidates = start + np.argpartition(hamming, shortlist - 1)[:shortlist]
+            block = self.emb_matrix[candidates]
+        else:
+            # Exact: at a few thousand rows one matmul is already cheap
+            candidates = np.arange(start, stop)
+            block = self.emb_matrix[start:stop]
+        scores = block @ q
+        k = min(top_k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        records = self.emb_records
+        # 1/(1+d) over the squared-L2 distance Chroma reports for unit vectors (d = 2 - 2cos), so scores stay comparable
+        sims = (1 / (1 + (2 - 2 * scores[top]).astype(np.float64))).tolist()
+        return [{'doc': records[row], 'score': sim, 'source': 'semantic'} for row, sim in zip(candidates[top].tolist(), sims)]
+    
+    def _embed_query(self, text):
+        vec = self.batcher.encode(f"query: {text}")
+        # Shared by every later cache hit
+        vec.flags.writeable = False
+        return vec
     
     def semantic_search(self, query, regulator, language, top_k=15, force_english=False):
         search_lang = 'en' if force_english else language
-        embedding = self.embedder.encode([f"query: {query}"]).tolist()
+        embedding = self._encode_query(query)
+        scope = ('semantic', regulator, search_lang, top_k)
+        cached = self.query_cache.get(embedding, scope)
+        if cached is not None:
+            return list(cached)
+        if self.emb_matrix is not None:
+            output = self._matrix_search(embedding, regulator, search_lang, top_k)
+            self.query_cache.put(embedding, output, scope)
+            return output
         where = {"language": {"$eq": search_lang}} if regulator == 'BOTH' else {"$and": [{"language": {"$eq": search_lang}}, {"regulator": {"$eq": regulator}}]}
         try:
-            results = self.collection.query(query_embeddings=embedding, n_results=top_k, where=where)
+            results = self.chroma_batcher.query(embedding, where, top_k)
+            prefiltered = True
         except:
-            results = self.collection.query(query_embeddings=embedding, n_results=top_k * 2)
+            results = self.chroma_batcher.query(embedding, None, top_k * 2)
+            prefiltered = False
         output = []
-        if results['documents'] and results['documents'][0]:
-            for doc_text, meta, dist in zip(results['documents'][0], results['metadatas'][0], results['distances'][0]):
-                if regulator != 'BOTH' and meta.get('regulator') != regulator:
-                    continue
-                if meta.get('language') != search_lang:
-                    continue
-                output.append({'doc': {'text': doc_text, 'article': meta.get('article', ''), 'document': meta.get('document', ''), 'regulator': meta.get('regulator', ''), 'language': meta.get('language', '')}, 'score': 1/(1+dist), 'source': 'semantic'})
-        return output[:top_k]
+        docs0 = results['documents'][0] if results['documents'] else None
+        if docs0:
+            metas0 = results['metadatas'][0]
+            sims = (1 / (1 + np.asarray(results['distances'][0], dtype=np.float64))).tolist()
+            rows = range(len(docs0))
+            if not prefiltered:
+                # Only the unfiltered retry can return other regulators or languages
+                rows = [i for i in rows if (regulator == 'BOTH' or metas0[i].get('regulator') == regulator) and metas0[i].get('language') == search_lang]
+            output = [{'doc': RetrievedDoc.from_meta(docs0[i], metas0[i]), 'score': sims[i], 'source': 'semantic'} for i in rows[:top_k]]
+        self.query_cache.put(embedding, output, scope)
+        return output
     
     def hybrid_search(self, query, n_results=3):
         user_language = self.detect_language(query)
-        regulator = self.detect_regulator(query)
+        found = self._keyword_hits(query)
+        regulator = self.detect_regulator(query, found)
         if user_language == 'ar':
-            english_query = self.translate_arabic_query(query)
+            english_query = self.translate_arabic_query(query, found)
             expanded = self.expand_query(english_query, 'en')
             print(f"DEBUG: Arabic Query → English Bridge")
             print(f"  Original: {query[:50]}")
             print(f"  Translated: {english_query[:50]}")
             print(f"  Regulator: {regulator}")
+            sem_future = self._search_pool.submit(self.semantic_search, expanded, regulator, user_language, force_english=True)
             bm25_res = self.bm25_search(expanded, regulator, user_language, force_english=True)
-            sem_res = self.semantic_search(expanded, regulator, user_language, force_english=True)
+            sem_res = sem_future.result()
         else:
-            expanded = self.expand_query(query, user_language)
+            expanded = self.expand_query(query, user_language, found)
             print(f"DEBUG: English Query='{query[:50]}', Reg={regulator}")
+            sem_future = self._search_pool.submit(self.semantic_search, expanded, regulator, user_language)
             bm25_res = self.bm25_search(expanded, regulator, user_language)
-            sem_res = self.semantic_search(expanded, regulator, user_language)
+            sem_res = sem_future.result()
         print(f"DEBUG: BM25={len(bm25_res)}, Semantic={len(sem_res)}")
-        doc_scores = {}
+        # RRF as one scatter-add; every chunk of an article shares its key, so they pool into one score
         k = 60
-        for rank, r in enumerate(bm25_res):
-            key = f"{r['doc']['document']}:{r['doc']['article']}"
-            if key not in doc_scores:
-                doc_scores[key] = {'doc': r['doc'], 'rrf': 0, 'src': set()}
-            doc_scores[key]['rrf'] += 1/(k+rank+1)
-            doc_scores[key]['src'].add('BM25')
-        for rank, r in enumerate(sem_res):
-            key = f"{r['doc']['document']}:{r['doc']['article']}"
-            if key not in doc_scores:
-                doc_scores[key] = {'doc': r['doc'], 'rrf': 0, 'src': set()}
-            doc_scores[key]['rrf'] += 1/(k+rank+1)
-            doc_scores[key]['src'].add('Semantic')
-        sorted_res = sorted(doc_scores.values(), key=lambda x: x['rrf'], reverse=True)
+        fused = bm25_res + sem_res
+        if not fused:
+            return [], regulator, user_language
+        keys = np.fromiter((r['doc'].key for r in fused), dtype=np.int64, count=len(fused))
+        ranks = np.concatenate((np.arange(len(bm25_res)), np.arange(len(sem_res))))
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        rrf = np.zeros(len(first))
+        np.add.at(rrf, inverse, 1 / (k + ranks + 1))
+        # Ties keep first-seen order (BM25 hits before semantic ones)
+        order = np.argsort(first)
+        top = order[np.argsort(-rrf[order], kind='stable')][:n_results]
         final = []
-        for r in sorted_res[:n_results]:
-            final.append(r['doc'])
-            print(f"  → {r['doc']['article']} [{'+'.join(r['src'])}]")
+        for group in top.tolist():
+            doc = fused[first[group]]['doc']
+            final.append(doc)
+            hits = np.flatnonzero(inverse == group)
+            src = [name for name, present in (('BM25', hits[0] < len(bm25_res)), ('Semantic', hits[-1] >= len(bm25_res))) if present]
+            print(f"  → {doc.article} [{'+'.join(src)}]")
         return final, regulator, user_language
     
+    FOLLOW_UP_EN = ['yes', 'yeah', 'sure', 'please', 'ok', 'okay', 'simplify', 'explain', 'example', 'examples', 'scenario', 'more details', 'elaborate', 'clarify', 'what do you mean', 'can you explain', 'help me understand', 'break it down', 'in simple terms', 'simpler', 'easier']
+    FOLLOW_UP_AR = ['نعم', 'أجل', 'طيب', 'حسنا', 'موافق', 'تمام', 'وضح', 'اشرح', 'مثال', 'أمثلة', 'سيناريو', 'تفاصيل أكثر', 'بسط', 'بشكل أبسط', 'ساعدني أفهم', 'ماذا تعني', 'اشرح أكثر']
+    OUT_OF_DOMAIN = ['weather', 'recipe', 'cook', 'movie', 'song', 'music', 'game', 'sport', 'football', 'soccer', 'basketball', 'joke', 'story', 'poem', 'write me', 'create a', 'translate', 'what is the capital', 'who is the president', 'how to code', 'python', 'javascript', 'programming', 'health', 'medical', 'doctor', 'disease', 'travel', 'hotel', 'flight', 'vacation', 'الطقس', 'وصفة', 'طبخ', 'فيلم', 'أغنية', 'موسيقى', 'لعبة', 'رياضة', 'كرة القدم', 'نكتة', 'قصة', 'قصيدة', 'ترجم', 'عاصمة', 'رئيس', 'برمجة', 'صحة', 'طبيب', 'سفر']
+    # Words that can surround a follow-up cue without naming a subject ("can you explain that more simply?")
+    FOLLOW_UP_FILLER = frozenset([
+        'a', 'an', 'the', 'it', 'its', 'this', 'that', 'these', 'those', 'them', 'me', 'us', 'i', 'you', 'we',
+        'can', 'could', 'would', 'will', 'do', 'does', 'is', 'are', 'be', 'what', 'how', 'so', 'and', 'or', 'but',
+        'of', 'to', 'for', 'in', 'on', 'with', 'about', 'again', 'more', 'bit', 'little', 'just', 'some', 'another',
+        'one', 'other', 'further', 'simple', 'simply', 'plain', 'words', 'terms', 'detail', 'details', 'give', 'show',
+        'tell', 'provide', 'mean', 'no', 'thanks', 'thank', 'got',
+        'هذا', 'هذه', 'ذلك', 'تلك', 'لي', 'من', 'في', 'على', 'عن', 'أكثر', 'مرة', 'أخرى', 'هل', 'ممكن', 'يمكنك',
+        'أن', 'و', 'ما', 'بشكل', 'شكرا', 'أعطني', 'المزيد', 'قليلا', 'فضلك', 'لو', 'سمحت',
+    ])
+    # Whole words only, so "ok" no longer fires inside "book"; Arabic has no \b, so whitespace or the string edge bounds it
+    _FOLLOW_UP_EN_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, FOLLOW_UP_EN)) + r')\b')
+    _FOLLOW_UP_AR_RE = re.compile(r'(?<!\S)(?:' + '|'.join(map(re.escape, FOLLOW_UP_AR)) + r')(?!\S)')
+    _OUT_OF_DOMAIN_RE = re.compile('|'.join(map(re.escape, OUT_OF_DOMAIN)))
+    
     def is_follow_up(self, query):
-        query_lower = query.lower().strip()
-        follow_up_en = ['yes', 'yeah', 'sure', 'please', 'ok', 'okay', 'simplify', 'explain', 'example', 'examples', 'scenario', 'more details', 'elaborate', 'clarify', 'what do you mean', 'can you explain', 'help me understand', 'break it down', 'in simple terms', 'simpler', 'easier']
-        follow_up_ar = ['نعم', 'أجل', 'طيب', 'حسنا', 'موافق', 'تمام', 'وضح', 'اشرح', 'مثال', 'أمثلة', 'سيناريو', 'تفاصيل أكثر', 'بسط', 'بشكل أبسط', 'ساعدني أفهم', 'ماذا تعني', 'اشرح أكثر']
-        if any(pattern in query_lower for pattern in follow_up_en):
-            return True
-        if any(pattern in query for pattern in follow_up_ar):
+        if self._FOLLOW_UP_EN_RE.search(query.lower()) or self._FOLLOW_UP_AR_RE.search(query):
             return True
         if len(query.strip()) < 15 and len(query.split()) <= 3:
             return True
         return False
     
+    def refers_to_previous(self, query):
+        """True when a follow-up names no subject of its own, so the last answer's documents are the right context."""
+        # Any word left after the cue phrases and filler (a regulation, an article number, "penalties") means a new topic
+        rest = self._FOLLOW_UP_AR_RE.sub(' ', self._FOLLOW_UP_EN_RE.sub(' ', query.lower()))
+        return all(token in self.FOLLOW_UP_FILLER for token in self._BM25_TOKEN_RE.findall(rest))
+    
     def is_out_of_domain(self, query):
-        query_lower = query.lower()
-        out_of_domain = ['weather', 'recipe', 'cook', 'movie', 'song', 'music', 'game', 'sport', 'football', 'soccer', 'basketball', 'joke', 'story', 'poem', 'write me', 'create a', 'translate', 'what is the capital', 'who is the president', 'how to code', 'python', 'javascript', 'programming', 'health', 'medical', 'doctor', 'disease', 'travel', 'hotel', 'flight', 'vacation', 'الطقس', 'وصفة', 'طبخ', 'فيلم', 'أغنية', 'موسيقى', 'لعبة', 'رياضة', 'كرة القدم', 'نكتة', 'قصة', 'قصيدة', 'ترجم', 'عاصمة', 'رئيس', 'برمجة', 'صحة', 'طبيب', 'سفر']
-        return any(term in query_lower for term in out_of_domain)
+        return self._OUT_OF_DOMAIN_RE.search(query.lower()) is not None
+    
+    _LINE_EDGE_RE = re.compile(r'[ \t]*\n[ \t]*')
+    _SPACE_RUN_RE = re.compile(r'[ \t]{2,}')
+    _BLANK_LINES_RE = re.compile(r'\n{3,}')
+    
+    def _compact_text(self, text):
+        # Drops padding the extractor left behind but keeps line breaks, which carry list and clause structure
+        text = self._LINE_EDGE_RE.sub('\n', text)
+        text = self._SPACE_RUN_RE.sub(' ', text)
+        text = self._BLANK_LINES_RE.sub('\n\n', text).strip()
+        return text[:PROMPT_CHUNK_MAX_CHARS]
+    
+    def _render_fragment(self, document, article, text):
+        return f"Source: {document}\nArticle: {article}\nContent:\n{self._compact_text(text)}"
+    
+    def _format_fragment(self, doc):
+        # Articles are split into several chunks, so the text is part of the key
+        return self._fragment(doc.document, doc.article, doc.text)
     
     def build_prompt(self, question, docs, language, is_follow_up=False, conversation_context=None):
-        ctx = "\n\n---\n\n".join([f"[Document {i}]\nSource: {d['document']}\nArticle: {d['article']}\nContent:\n{d['text']}" for i, d in enumerate(docs, 1)])
-        conv_context = ""
-        if is_follow_up and conversation_context:
-            conv_context = "\n\nPrevious conversation:\n"
-            for msg in conversation_context[-4:]:
-                role = "User" if msg['role'] == 'user' else "Assistant"
-                conv_context += f"{role}: {msg['content'][:500]}\n"
-        if language == 'ar':
-            if is_follow_up:
-                return f"""أنت مساعد قانوني متخصص في الأنظمة المالية السعودية (ساما وهيئة السوق المالية).
-
-المحادثة السابقة:
-{conv_context}
-
-المستندات المرجعية:
-{ctx}
-
-طلب المستخدم: {question}
-
-المستخدم يطلب توضيحاً أو تبسيطاً. قم بما يلي:
-- إذا طلب تبسيط: اشرح المفهوم بلغة سهلة وواضحة
-- إذا طلب مثال: قدم سيناريو عملي يوضح التطبيق
-- إذا طلب توضيح: اشرح النقاط الغامضة بالتفصيل
-
-الإجابة:"""
-            else:
-                return f"""أنت مساعد قانوني متخصص في الأنظمة المالية السعودية (ساما وهيئة السوق المالية).
-
-تعليمات مهمة:
-- اقرأ كل مستند بعناية قبل الإجابة
-- استخرج المعلومات المطلوبة من المستندات
-- اذكر رقم المادة عند الاستشهاد (مثال: المادة 22)
-- مصطلح "debt instruments" يعني "الصكوك" أو "أدوات الدين"
-- اكتب الأرقام والمبالغ كما هي في المستند
-- استخدم تنسيق Markdown: استخدم **نص** للتأكيد و - للقوائم
-- إذا لم تجد المعلومة المحددة، قل ذلك بوضوح
-- لا تذكر أنك ستساعد في نهاية الإجابة
-
-المستندات المرجعية:
-{ctx}
-
-السؤال: {question}
-
-الإجابة:"""
+        """Returns (system, prompt): the static instructions and the per-question documents and question."""
+        # Follow-ups send the same documents again, so the assembled block is kept for the last few doc sets
+        key = tuple((d.document, d.article, d.text) for d in docs)
+        with self._ctx_lock:
+            ctx = self._ctx_cache.get(key)
+            if ctx is not None:
+                self._ctx_cache.move_to_end(key)
+        if ctx is None:
+            # Built outside the lock; two threads racing on the same docs just produce the same string
+            ctx = "\n\n---\n\n".join([f"[Document {i}]\n{self._format_fragment(d)}" for i, d in enumerate(docs, 1)])
+            with self._ctx_lock:
+                self._ctx_cache[key] = ctx
+                if len(self._ctx_cache) > PROMPT_CONTEXT_CACHE_SIZE:
+                    self._ctx_cache.popitem(last=False)
+        lang = 'ar' if language == 'ar' else 'en'
+        labels = self.PROMPT_LABELS[lang]
+        system = self.PROMPT_SYSTEM[(lang, bool(is_follow_up))]
         if is_follow_up:
-            return f"""You are a legal assistant specializing in Saudi Arabian financial regulations (SAMA and CMA).
-
-Previous conversation:
-{conv_context}
-
-Reference Documents:
-{ctx}
-
-User request: {question}
-
-The user is asking for clarification or simplification. Do the following:
-- If they want simplification: Explain the concept in plain, easy-to-understand language
-- If they want examples: Provide a practical scenario showing how this applies
-- If they want clarification: Explain the unclear points in detail
-
-Answer:"""
-        else:
-            return f"""You are a legal assistant specializing in Saudi Arabian financial regulations (SAMA and CMA).
-
-Important instructions:
-- Read each document carefully before answering
-- Extract the relevant information from the documents
-- Cite the Article number when referencing information (e.g., "Article 22")
-- "Sukuk" and "debt instruments" refer to the same thing
-- Preserve exact numbers and amounts as written in the documents
-- Use Markdown formatting: **bold** for emphasis and - for lists
-- If the specific information is not found, say so clearly
-- Do not offer further assistance at the end of your response
-
-Reference Documents:
-{ctx}
-
-Question: {question}
-
-Answer:"""
+            conv_context = ""
+            if conversation_context:
+                conv_context = "".join(
+                    f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content'][:500]}\n" for msg in conversation_context[-4:]
+                )
+            return system, "".join((labels['history'], conv_context, "\n", labels['docs'], ctx, labels['request'], question, labels['answer']))
+        return system, "".join((labels['docs'], ctx, labels['question'], question, labels['answer']))
     
     def build_out_of_domain_response(self, language):
         if language == 'ar':
@@ -982,26 +1958,36 @@ I can help you with:
 
 Please ask a question related to these topics."""
     
-    def _chunk_text(self, text, chunk_size=1000, overlap=200):
+    def _chunk(self, text, chunk_size=1000, overlap=200):
         """Helper to split uploaded text into overlap chunks for analysis."""
-        if not text: return []
-        chunks = []
-        start = 0
-        text_len = len(text)
-        while start < text_len:
-            end = start + chunk_size
-            chunks.append(text[start:end])
-            start += (chunk_size - overlap)
-        return chunks
-
-    def generate_executive_brief(self):
+        return [text[start:start + chunk_size] for start in np.arange(0, len(text), chunk_size - overlap).tolist()]
+
+    def _embed_chunks(self, chunks):
+        """Embeds document chunks, encoding only those not already cached from an earlier brief."""
+        # Keyed by a 16-byte digest so the cache does not hold on to whole uploaded documents
+        keys = [hashlib.blake2b(chunk.encode('utf-8'), digest_size=16).digest() for chunk in chunks]
+        cache = self._chunk_emb_cache
+        texts = dict(zip(keys, chunks))
+        # Hits are copied out under the lock, so another brief evicting them meanwhile can't break this one
+        with self._chunk_emb_lock:
+            found = {key: cache[key] for key in texts if key in cache}
+        missing = [key for key in texts if key not in found]
+        if missing:
+            fresh = self.embedder.encode([texts[key] for key in missing], batch_size=self.embed_batch_size, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=True)
+            found.update(zip(missing, fresh))
+        with self._chunk_emb_lock:
+            for key, vector in found.items():
+                cache[key] = vector
+                cache.move_to_end(key)
+            while len(cache) > CHUNK_EMBEDDING_CACHE_SIZE:
+                cache.popitem(last=False)
+        return np.stack([found[key] for key in keys])
+
+    def generate_executive_brief(self, on_token=None):
         """
         Generates a 3-part Executive Summary using manual chunking and on-the-fly embedding.
         Corrected to match TadqeeqRAG v3.0 architecture.
         """
-        import numpy as np
-        import ollama
-
         # 1. Get text from the uploaded document processor
         text = self.doc_processor.get_current_text()
         if not text:
@@ -1009,49 +1995,30 @@ Please ask a question related to these topics."""
 
         print("--- Starting Executive Brief Generation ---")
 
-        # 2. Manual Chunking (Split text into manageable pieces)
-        chunk_size = 1000
-        overlap = 200
-        chunks = []
-        start = 0
-        text_len = len(text)
-        
-        if text_len < 50:
+        if len(text) < 50:
             return {"error": "Document is too short to analyze."}
 
-        while start < text_len:
-            end = start + chunk_size
-            chunks.append(text[start:end])
-            start += (chunk_size - overlap)
-        
+        # 2. Chunking (Split text into manageable pieces)
+        chunks = self._chunk(text)
         print(f"--- Document split into {len(chunks)} chunks ---")
 
-        # 3. Embed chunks (On-the-fly)
+        # 3. Embed chunks (on-the-fly; a second brief of the same upload reuses the cached vectors)
         try:
-            chunk_embeddings = self.embedder.encode(chunks)
+            chunk_embeddings = self._embed_chunks(chunks)
         except Exception as e:
             return {"error": f"Embedding failed: {str(e)}"}
 
-        # 4. Multi-Targeted Retrieval
-        targets = [
-            "What are the key risks, violations, penalties, and compliance red flags?",
-            "What are the fees, capital requirements, costs, and financial obligations?",
-            "What are the effective dates, deadlines, submission timelines, and expiry dates?"
-        ]
-
-        unique_indices = set()
-        
-        for query in targets:
-            query_embedding = self.embedder.encode(query)
-            # Calculate Cosine Similarity via Dot Product
-            scores = np.dot(chunk_embeddings, query_embedding)
-            # Get top 5 indices for this query
-            top_k_indices = np.argsort(scores)[-5:][::-1]
-            for idx in top_k_indices:
-                unique_indices.add(idx)
+        # 4. Multi-Targeted Retrieval (target embeddings precomputed at startup)
+        # Cosine similarity of every chunk against every target in one matmul: (N_chunks, 3)
+        scores = chunk_embeddings @ self.brief_target_embeddings.T
+        # Top 5 chunks per target
+        k = min(5, len(chunks))
+        top_k_indices = np.argpartition(-scores, k - 1, axis=0)[:k]
+        # Sorted and deduplicated, so the context reads in document order
+        unique_indices = np.unique(top_k_indices)
 
         # 5. Assemble Context
-        relevant_chunks = [chunks[i] for i in unique_indices]
+        relevant_chunks = [chunks[i] for i in unique_indices.tolist()]
         combined_context = "\n\n...\n\n".join(relevant_chunks)
         print(f"--- Analyzed {len(relevant_chunks)} unique chunks ---")
 
@@ -1079,33 +2046,125 @@ Please ask a question related to these topics."""
 
         # 7. Generate via Ollama
         try:
-            # We use the globally defined LLM_MODEL from your config
-            resp = ollama.generate(model=LLM_MODEL, prompt=prompt, options={'temperature': 0.1})
-            result = resp['response'].strip()
+            # Streamed so the UI can show the brief as it is written
+            parts = []
+            for token in self._stream_llm(prompt=prompt, options={'temperature': 0.1}):
+                parts.append(token)
+                if on_token:
+                    on_token(token)
+            result = ''.join(parts).strip()
             self.last_brief = result
             return {"report": result}
         except Exception as e:
             print(f"Error generating brief: {e}")
             return {"error": f"Failed to generate brief: {str(e)}"}
     
-    def generate_response(self, question):
-        import ollama
+    def _get_cached_answer(self, embedding, lang):
+        if self.answer_collection is None:
+            return None
+        try:
+            res = self.answer_collection.query(query_embeddings=embedding[None, :], n_results=1, where={"language": {"$eq": lang}}, include=['documents', 'metadatas', 'distances'])
+        except Exception:
+            return None
+        if not res['ids'] or not res['ids'][0] or res['distances'][0][0] > ANSWER_CACHE_DISTANCE:
+            return None
+        meta = res['metadatas'][0][0]
+        docs = [self.documents[i] for i in json_loads(meta.get('doc_ids', '[]')) if i < len(self.documents)]
+        return {'answer': res['documents'][0][0], 'sources': json_loads(meta['sources']), 'regulator': meta['regulator']}, docs
+    
+    def _store_cached_answer(self, embedding, lang, result, docs):
+        if self.answer_collection is None:
+            return
+        positions = (self._doc_positions.get((d.document, d.article, d.text)) for d in docs)
+        doc_ids = [i for i in positions if i is not None]
+        try:
+            self.answer_collection.add(
+                ids=[str(uuid.uuid4())], embeddings=embedding[None, :], documents=[result['answer']],
+                metadatas=[{'language': lang, 'regulator': result['regulator'], 'sources': json_dumps(result['sources']), 'doc_ids': json_dumps(doc_ids), 'created': time.time()}]
+            )
+            if self.answer_collection.count() > ANSWER_CACHE_MAX_ENTRIES:
+                self._prune_answer_cache()
+        except Exception as e:
+            print(f"    Answer cache write failed: {e}")
+    
+    def _prune_answer_cache(self):
+        # Oldest answers go first; trimmed 10% below the cap so this runs once per couple hundred answers, not on every one
+        entries = self.answer_collection.get(include=['metadatas'])
+        by_age = sorted(zip(entries['ids'], entries['metadatas']), key=lambda entry: (entry[1] or {}).get('created', 0))
+        excess = len(by_age) - (ANSWER_CACHE_MAX_ENTRIES - ANSWER_CACHE_MAX_ENTRIES // 10)
+        if excess > 0:
+            self.answer_collection.delete(ids=[entry_id for entry_id, _ in by_age[:excess]])
+    
+    def _stream_llm(self, **kwargs):
+        """Yields the text pieces of a streaming Ollama generate call as they arrive."""
+        for chunk in self.llm.generate(model=LLM_MODEL, keep_alive=OLLAMA_KEEP_ALIVE, stream=True, **kwargs):
+            token = chunk['response']
+            if token:
+                yield token
+    
+    def stream_response(self, question):
+        """Yields {'delta': text} for each generated piece, then {'result': ...} with the full answer, sources and regulator."""
         lang = self.detect_language(question)
         if self.is_out_of_domain(question):
-            return {'answer': self.build_out_of_domain_response(lang), 'sources': [], 'regulator': 'NONE'}
+            yield {'result': {'answer': self.build_out_of_domain_response(lang), 'sources': [], 'regulator': 'NONE'}}
+            return
         is_followup = self.is_follow_up(question)
         conversation_context = None
+        question_embedding = None
         if is_followup:
             conversation_context = self.chat_history.get_conversation_context()
-        docs, reg, lang = self.hybrid_search(question)
+        else:
+            # A new question; whatever it's answered from becomes the basis for the next follow-up
+            self.chat_history.last_retrieval = None
+            # Standalone questions don't depend on chat history, so repeats can skip the LLM
+            question_embedding = self._encode_query(question)
+            cached = self.query_cache.get(question_embedding, ('answer', lang), threshold=ANSWER_CACHE_THRESHOLD)
+            if cached is None:
+                cached = self._get_cached_answer(question_embedding, lang)
+                if cached is not None:
+                    self.query_cache.put(question_embedding, cached, ('answer', lang))
+            if cached is not None:
+                result, docs = cached
+                # The cached turn backs the next follow-up just as a freshly generated one would
+                self.chat_history.last_retrieval = (docs, result['regulator']) if docs else None
+                yield {'result': dict(result)}
+                return
+        previous = self.chat_history.last_retrieval if is_followup and self.refers_to_previous(question) else None
+        if previous is not None:
+            # "Simpler", "give an example" and the like are about the last answer, so its documents are reused as-is;
+            # a follow-up that names its own subject is retrieved for like any other question
+            docs, reg = previous
+        else:
+            docs, reg, lang = self.hybrid_search(question)
         if not docs:
             no_info = 'No relevant information found.' if lang == 'en' else 'لم يتم العثور على معلومات ذات صلة.'
-            return {'answer': no_info, 'sources': [], 'regulator': reg}
-        prompt = self.build_prompt(question, docs, lang, is_followup, conversation_context)
-        resp = ollama.generate(model=LLM_MODEL, prompt=prompt, options={'temperature': 0.1, 'num_predict': 2000})
-        seen = set()
-        sources = [{'article': d['article'], 'document': d['document']} for d in docs if d['article'] not in seen and not seen.add(d['article'])]
-        return {'answer': resp['response'].strip(), 'sources': sources, 'regulator': reg}
+            yield {'result': {'answer': no_info, 'sources': [], 'regulator': reg}}
+            return
+        self.chat_history.last_retrieval = (docs, reg)
+        system, prompt = self.build_prompt(question, docs, lang, is_followup, conversation_context)
+        options = {'temperature': 0.1, 'num_predict': 2000, 'num_ctx': LLM_NUM_CTX, 'stop': self.PROMPT_STOP}
+        parts = []
+        for token in self._stream_llm(system=system, prompt=prompt, options=options):
+            parts.append(token)
+            yield {'delta': token}
+        answer = ''.join(parts)
+        # Same article number in two different regulations is two sources; first hit wins, rank order kept
+        unique = dict.fromkeys((d.article, d.document) for d in docs)
+        # 'short' is the chip label, cut here once instead of on every render in the UI
+        sources = [{'article': article, 'document': document, 'short': article if len(article) <= SOURCE_LABEL_MAX else article[:SOURCE_LABEL_MAX] + '…'} for article, document in unique]
+        result = {'answer': answer.strip(), 'sources': sources, 'regulator': reg}
+        if question_embedding is not None:
+            self.query_cache.put(question_embedding, (result, docs), ('answer', lang))
+            self._store_cached_answer(question_embedding, lang, result, docs)
+        yield {'result': result}
+    
+    def generate_response(self, question, on_token=None):
+        """Runs stream_response to completion, handing each piece to `on_token` if given."""
+        for event in self.stream_response(question):
+            if 'result' in event:
+                return event['result']
+            if on_token:
+                on_token(event['delta'])
 
 
 # ==============================================================================
@@ -1125,7 +2184,7 @@ class API:
         """Endpoint for the UI to trigger the Executive Brief generation."""
         if not self.rag:
             return {'error': 'System not initialized'}
-        return self.rag.generate_executive_brief()
+        return self.rag.generate_executive_brief(on_token=self._push_brief_token)
     
     
     def set_window(self, window):
@@ -1151,8 +2210,11 @@ class API:
             return {'status': 'already_started'}
         self._init_started = True
         def init_background():
-            self.rag = TadqeeqRAG.get_instance()
-            self.rag.initialize()
+            try:
+                self.rag = TadqeeqRAG.get_instance()
+                self.rag.initialize()
+            finally:
+                TadqeeqRAG._ready_event.set()
         self._init_thread = threading.Thread(target=init_background, daemon=True)
         self._init_thread.start()
         return {'status': 'started'}
@@ -1160,14 +2222,8 @@ class API:
     def initialize(self):
         if not self._init_started:
             self.start_initialization()
-        timeout = 120
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            if TadqeeqRAG._initialized:
-                return self.get_init_status()
-            if TadqeeqRAG._init_error:
-                return self.get_init_status()
-            time.sleep(0.5)
+        if TadqeeqRAG._ready_event.wait(timeout=120):
+            return self.get_init_status()
         return {'status': 'error', 'message': 'Initialization timeout'}
     
     def upload_document(self, file_data, filename):
@@ -1178,12 +2234,12 @@ class API:
     def run_compliance_check(self):
         if not self.rag:
             return {'error': 'System not initialized'}
-        text = self.rag.doc_processor.get_current_text()
-        if not text:
+        doc_processor = self.rag.doc_processor
+        if not doc_processor.current_pages:
             return {'error': 'No document uploaded'}
         
         # 1. Run the check
-        final_result = self.rag.compliance_checker.check_compliance(text, self.rag.doc_processor.current_filename)
+        final_result = self.rag.compliance_checker.check_compliance(doc_processor.iter_text(), doc_processor.current_filename)
         
         # 2. SAVE THE RESULT (This is what you were missing!)
         self.last_compliance_result = final_result 
@@ -1216,12 +2272,12 @@ class API:
                 if save_path:
                     path = save_path if isinstance(save_path, str) else save_path[0] if save_path else None
                     if path:
-                        with open(path, 'w', encoding='utf-8') as f:
+                        with open(path, 'w', encoding='utf-8', buffering=EXPORT_WRITE_BUFFER) as f:
                             f.write(md_content)
                         return {'success': True, 'path': path}
                 return {'error': 'Export cancelled'}
             else:
-                with open(filename, 'w', encoding='utf-8') as f:
+                with open(filename, 'w', encoding='utf-8', buffering=EXPORT_WRITE_BUFFER) as f:
                     f.write(md_content)
                 return {'success': True, 'path': filename}
         except Exception as e:
@@ -1238,7 +2294,6 @@ class API:
             pdf_data, error = self.rag.chat_exporter.export_pdf(messages)
             if error:
                 return {'error': error}
-            pdf_bytes = base64.b64decode(pdf_data)
             filename = f'tadqeeq_chat_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
             if self.window:
                 try:
@@ -1248,13 +2303,13 @@ class API:
                 if save_path:
                     path = save_path if isinstance(save_path, str) else save_path[0] if save_path else None
                     if path:
-                        with open(path, 'wb') as f:
-                            f.write(pdf_bytes)
+                        with open(path, 'wb', buffering=EXPORT_WRITE_BUFFER) as f:
+                            f.write(pdf_data)
                         return {'success': True, 'path': path}
                 return {'error': 'Export cancelled'}
             else:
-                with open(filename, 'wb') as f:
-                    f.write(pdf_bytes)
+                with open(filename, 'wb', buffering=EXPORT_WRITE_BUFFER) as f:
+                    f.write(pdf_data)
                 return {'success': True, 'path': filename}
         except Exception as e:
             return {'error': str(e)}
@@ -1267,6 +2322,23 @@ class API:
         self.rag.chat_history.add_message('assistant', result['answer'], result.get('sources'), result.get('regulator'))
         return result
     
+    def query_stream(self, question):
+        """Same as query(), but pushes answer tokens to the page via window.appendToken as they arrive."""
+        if not self.rag:
+            return {'error': 'System not initialized'}
+        self.rag.chat_history.add_message('user', question)
+        result = self.rag.generate_response(question, on_token=self._push_token)
+        self.rag.chat_history.add_message('assistant', result['answer'], result.get('sources'), result.get('regulator'))
+        return result
+    
+    def _push_token(self, token):
+        if self.window:
+            self.window.evaluate_js(f"window.appendToken({json_dumps(token)})")
+    
+    def _push_brief_token(self, token):
+        if self.window:
+            self.window.evaluate_js(f"window.appendBriefToken({json_dumps(token)})")
+    
     def new_chat(self):
         if not self.rag:
             return {'error': 'System not initialized'}
@@ -1307,7 +2379,7 @@ class API:
              if save_path:
                  path = save_path if isinstance(save_path, str) else save_path[0] if save_path else None
                  if path:
-                     with open(path, 'w', encoding='utf-8') as f: f.write(content)
+                     with open(path, 'w', encoding='utf-8', buffering=EXPORT_WRITE_BUFFER) as f: f.write(content)
                      return {'success': True, 'path': path}
         return {'error': 'Export cancelled'}
 
@@ -1316,7 +2388,7 @@ class API:
         if not self.rag or not self.rag.last_brief: return {'error': 'No brief generated'}
         
         filename = f'Executive_Brief_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-        content_b64, err = self.rag.chat_exporter.export_brief_pdf(self.rag.last_brief)
+        pdf_data, err = self.rag.chat_exporter.export_brief_pdf(self.rag.last_brief)
         if err: return {'error': err}
         
         if self.window:
@@ -1328,7 +2400,7 @@ class API:
              if save_path:
                  path = save_path if isinstance(save_path, str) else save_path[0] if save_path else None
                  if path:
-                     with open(path, 'wb') as f: f.write(base64.b64decode(content_b64))
+                     with open(path, 'wb', buffering=EXPORT_WRITE_BUFFER) as f: f.write(pdf_data)
                      return {'success': True, 'path': path}
         return {'error': 'Export cancelled'}
     
@@ -1340,7 +2412,6 @@ class API:
         
         from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         from reportlab.lib.units import cm
         from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
         
@@ -1351,11 +2422,11 @@ class API:
             buffer = BytesIO()
             # 17cm usable width for A4
             doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
-            styles = getSampleStyleSheet()
+            styles = get_pdf_styles()
             story = []
 
             # 1. Professional Header
-            title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=22, alignment=0, spaceAfter=10, textColor=colors.HexColor('#00d4aa'))
+            title_style = styles['ComplianceTitle']
             story.append(Paragraph("Regulatory Compliance Audit", title_style))
             story.append(Paragraph(f"<b>Document:</b> {data['filename']}", styles['Normal']))
             story.append(Paragraph(f"<b>Date:</b> {datetime.now().strftime('%B %d, %Y')}", styles['Normal']))
@@ -1388,15 +2459,15 @@ class API:
 
             # Build and Export
             doc.build(story)
-            pdf_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+            pdf_data = buffer.getvalue()
             buffer.close()
 
             if self.window:
                 save_path = self.window.create_file_dialog(webview.SAVE_DIALOG, save_filename=filename, file_types=('PDF Files (*.pdf)',))
                 if save_path:
                     path = save_path if isinstance(save_path, str) else save_path[0]
-                    with open(path, 'wb') as f:
-                        f.write(base64.b64decode(pdf_b64))
+                    with open(path, 'wb', buffering=EXPORT_WRITE_BUFFER) as f:
+                        f.write(pdf_data)
                     return {'success': True, 'path': path}
             return {'error': 'Export cancelled'}
 